@@ -1,38 +1,409 @@
-from fastapi import FastAPI, HTTPException, Depends, Query, Request
+from fastapi import FastAPI, HTTPException, Depends, Header, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy import create_engine, Column, Integer, String, Boolean, DateTime, func
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from sqlalchemy import (
+    select, delete, update, union_all, false, Column, Integer, String, Boolean, Date, DateTime, Index, MetaData,
+    Table, Text, case, func, and_, or_
+)
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy.orm import sessionmaker, Session
-from pydantic import BaseModel, EmailStr, validator, Field
-from datetime import datetime, timedelta
-from typing import Optional, List
+from pydantic import BaseModel, EmailStr, ValidationError, validator, Field
+from datetime import date, datetime, timedelta
+from typing import AsyncIterator, Iterable, Optional, List, Union
+from bisect import bisect_right
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from io import StringIO
+import asyncio
+import base64
+import contextvars
+import csv
+import hmac
+import json
+import math
+import os
 import re
+import secrets
+import signal
+import threading
+import time
+import zlib
 import uvicorn
-import os   
+
+from db_engine import create_db_engine, pool_stats, sqlite_pragmas
+from email_index import EmailIndex, build_hashes
+from idempotency import (
+    MAX_KEY_LENGTH, DatabaseIdempotencyStore, IdempotencyKeyInProgress, IdempotencyKeyReused,
+    IdempotencyManager, MemoryIdempotencyStore, request_fingerprint
+)
+from live_feed import LiveFeed
+from metrics import MetricsMiddleware, WaitlistMetrics, process_age_seconds, resident_memory_bytes
+from migrations import Migration, add_columns, create_indexes, create_tables, drop_indexes, run_migrations
+from profiler import ProfileStore, ProfilerMiddleware, RequestProfiler, call_in_capture, folded_output
+from rate_limit import RateLimited, RateLimiter, create_buckets, parse_limit, subnet_key
+from read_replica import ReadRouter
+from response_cache import ResponseCache, create_backend
+from write_queue import GroupCommitQueue, WriteQueueUnavailable
 
 
 # Database setup
 DATABASE_URL= os.getenv("DATABASE_URL")
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+DB_THREADPOOL_SIZE = int(os.getenv("DB_THREADPOOL_SIZE", "15"))
+
+# Connection pool per engine and worker process
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+# Unset: on for network databases, off for SQLite files
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING")
+# Connections each worker opens at startup, before it accepts traffic
+DB_POOL_WARM_CONNECTIONS = int(os.getenv("DB_POOL_WARM_CONNECTIONS", str(DB_POOL_SIZE)))
+
+# SQLite pragmas applied to every new connection; WAL lets readers run alongside the writer
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "wal")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "normal")
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "15000"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+# Negative values are KiB: 16 MiB of page cache per connection, on top of the shared mmap
+SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", "-16384"))
+# Apply pending schema migrations when the app is imported; turn off to run migrate.py at deploy time
+AUTO_MIGRATE = os.getenv("AUTO_MIGRATE", "true").lower() in ("1", "true", "yes")
+COUNTERS_RECONCILE_SECONDS = float(os.getenv("COUNTERS_RECONCILE_SECONDS", "3600"))
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "2000"))
+# GET /api/waitlist/changes holds back rows updated this recently: writers stamp updated_at
+# before they get the write lock, so an earlier stamp can commit after a later one
+CHANGES_SETTLE_SECONDS = float(os.getenv("CHANGES_SETTLE_SECONDS", "30"))
+# Entries inactive this long move to waitlist_archive, via archive_inactive.py or, when
+# ARCHIVE_INTERVAL_SECONDS is set, a background job in every worker
+ARCHIVE_RETENTION_DAYS = float(os.getenv("ARCHIVE_RETENTION_DAYS", "180"))
+ARCHIVE_INTERVAL_SECONDS = float(os.getenv("ARCHIVE_INTERVAL_SECONDS", "0"))
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "1000"))
+# POST /api/waitlist/positions: emails per request, and per IN (...) query and streamed chunk
+POSITION_LOOKUP_MAX_EMAILS = int(os.getenv("POSITION_LOOKUP_MAX_EMAILS", "5000"))
+POSITION_LOOKUP_CHUNK_SIZE = int(os.getenv("POSITION_LOOKUP_CHUNK_SIZE", "500"))
+BULK_BATCH_SIZE = int(os.getenv("BULK_BATCH_SIZE", "5000"))
+BULK_MAX_REPORTED_ERRORS = int(os.getenv("BULK_MAX_REPORTED_ERRORS", "1000"))
+
+# Group-commit mode for signups (write-behind queue flushed by a single writer)
+SIGNUP_WRITE_QUEUE = os.getenv("SIGNUP_WRITE_QUEUE", "false").lower() in ("1", "true", "yes")
+SIGNUP_BATCH_SIZE = int(os.getenv("SIGNUP_BATCH_SIZE", "200"))
+SIGNUP_BATCH_DELAY_MS = float(os.getenv("SIGNUP_BATCH_DELAY_MS", "5"))
+SIGNUP_QUEUE_LIMIT = int(os.getenv("SIGNUP_QUEUE_LIMIT", "10000"))
+
+# Opt-in request profiler: a fraction of requests and/or everything slower than PROFILE_SLOW_MS
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_SLOW_MS = float(os.getenv("PROFILE_SLOW_MS", "0"))
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_MAX_MB = float(os.getenv("PROFILE_MAX_MB", "100"))
+PROFILING_ENABLED = PROFILE_SAMPLE_RATE > 0 or PROFILE_SLOW_MS > 0
+
+# Read-through response cache; CACHE_URL=redis://... shares it between workers
+CACHE_URL = os.getenv("CACHE_URL")
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+CACHE_TTL_STATS = float(os.getenv("CACHE_TTL_STATS", "5"))
+CACHE_TTL_HEALTH = float(os.getenv("CACHE_TTL_HEALTH", "2"))
+CACHE_TTL_POSITION = float(os.getenv("CACHE_TTL_POSITION", "10"))
+# How long a worker may serve ETags from a version another worker has since bumped
+CACHE_TTL_VERSION = float(os.getenv("CACHE_TTL_VERSION", "1"))
+
+# In-memory index of active emails for the repeat-signup / unknown-email fast paths
+EMAIL_INDEX_ENABLED = os.getenv("EMAIL_INDEX_ENABLED", "true").lower() in ("1", "true", "yes")
+EMAIL_INDEX_REBUILD_SECONDS = float(os.getenv("EMAIL_INDEX_REBUILD_SECONDS", "300"))
+
+# Proxies whose X-Forwarded-For uvicorn trusts for the client address (comma-separated IPs or "*";
+# "*" on Render, where only its proxy reaches the service). Unset, every request behind a proxy
+# has the proxy's address, so the per-IP and per-subnet signup limits stay off by default
+FORWARDED_ALLOW_IPS = os.getenv("FORWARDED_ALLOW_IPS")
+
+# Signup rate limits ("<count>/<second|minute|hour|day>", empty to disable a rule);
+# RATE_LIMIT_URL=redis://... shares the buckets between workers
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() in ("1", "true", "yes")
+RATE_LIMIT_URL = os.getenv("RATE_LIMIT_URL", CACHE_URL)
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+RATE_LIMIT_SIGNUP_IP = os.getenv("RATE_LIMIT_SIGNUP_IP", "30/minute" if FORWARDED_ALLOW_IPS else "")
+RATE_LIMIT_SIGNUP_SUBNET = os.getenv("RATE_LIMIT_SIGNUP_SUBNET", "120/minute" if FORWARDED_ALLOW_IPS else "")
+RATE_LIMIT_SIGNUP_EMAIL = os.getenv("RATE_LIMIT_SIGNUP_EMAIL", "10/minute")
+
+# Idempotency-Key replays for signups: "memory" (per worker) or "database" (shared, durable)
+IDEMPOTENCY_STORE = os.getenv("IDEMPOTENCY_STORE", "memory")
+IDEMPOTENCY_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+IDEMPOTENCY_MAX_KEYS = int(os.getenv("IDEMPOTENCY_MAX_KEYS", "100000"))
+# How long a duplicate waits for the first request before a 409, and how long a claim left by
+# a worker that died mid-request blocks its key
+IDEMPOTENCY_WAIT_SECONDS = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "10"))
+IDEMPOTENCY_CLAIM_SECONDS = float(os.getenv("IDEMPOTENCY_CLAIM_SECONDS", "60"))
+
+# Server-Sent Events feed: at most one coalesced update per interval per worker
+SSE_UPDATE_INTERVAL_MS = float(os.getenv("SSE_UPDATE_INTERVAL_MS", "1000"))
+SSE_HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))
+SSE_QUEUE_SIZE = int(os.getenv("SSE_QUEUE_SIZE", "32"))
+SSE_MAX_SUBSCRIBERS = int(os.getenv("SSE_MAX_SUBSCRIBERS", "10000"))
+
+# Optional read replica for stats, entries, export, position and health reads
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL")
+READ_REPLICA_CHECK_SECONDS = float(os.getenv("READ_REPLICA_CHECK_SECONDS", "1"))
+# Waitlist versions the replica may trail the version a response is keyed on; above 0,
+# cached and ETagged responses can hold data that old
+READ_REPLICA_MAX_LAG = int(os.getenv("READ_REPLICA_MAX_LAG", "0"))
+# After a client signs up or unsubscribes, its reads stay on the primary this long. The client is
+# the email written and the cookie below; both are remembered per worker, so a read that lands on
+# another worker within this window can still be answered by a lagging replica
+READ_REPLICA_STICKY_SECONDS = float(os.getenv("READ_REPLICA_STICKY_SECONDS", "5"))
+READ_REPLICA_STICKY_COOKIE = "waitlist_sticky"
+
+# Admin endpoints are disabled unless a token is configured
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+# Async drivers and the sync driver used for schema setup and maintenance scripts
+ASYNC_DRIVERS = {"aiosqlite": "pysqlite", "asyncpg": "psycopg2"}
+
+database_url = make_url(DATABASE_URL)
+USE_ASYNC_DB = database_url.get_driver_name() in ASYNC_DRIVERS
+
+db_pool_settings = {
+    "pool_size": DB_POOL_SIZE,
+    "max_overflow": DB_MAX_OVERFLOW,
+    "pool_timeout": DB_POOL_TIMEOUT,
+    "pool_recycle": DB_POOL_RECYCLE,
+    "pre_ping": None if DB_POOL_PRE_PING is None else DB_POOL_PRE_PING.lower() in ("1", "true", "yes"),
+}
+db_pragmas = sqlite_pragmas(
+    journal_mode=SQLITE_JOURNAL_MODE,
+    synchronous=SQLITE_SYNCHRONOUS,
+    busy_timeout_ms=SQLITE_BUSY_TIMEOUT_MS,
+    mmap_size=SQLITE_MMAP_SIZE,
+    cache_size=SQLITE_CACHE_SIZE
+)
+
+if USE_ASYNC_DB:
+    async_engine = create_db_engine(database_url, is_async=True, pool=db_pool_settings, pragmas=db_pragmas)
+    AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False)
+    sync_database_url = database_url.set(
+        drivername=f"{database_url.get_backend_name()}+{ASYNC_DRIVERS[database_url.get_driver_name()]}"
+    )
+else:
+    async_engine = None
+    AsyncSessionLocal = None
+    sync_database_url = database_url
+
+engine = create_db_engine(sync_database_url, pool=db_pool_settings, pragmas=db_pragmas)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# read_engine is the sync Engine behind replica sessions (the async engine's, for async drivers)
+read_engine = None
+read_async_engine = None
+ReadSessionLocal = None
+if DATABASE_READ_URL:
+    read_database_url = make_url(DATABASE_READ_URL)
+    if read_database_url.get_driver_name() in ASYNC_DRIVERS:
+        read_async_engine = create_db_engine(read_database_url, is_async=True, pool=db_pool_settings, pragmas=db_pragmas)
+        ReadSessionLocal = async_sessionmaker(read_async_engine, class_=AsyncSession, autoflush=False)
+        read_engine = read_async_engine.sync_engine
+    else:
+        read_engine = create_db_engine(read_database_url, pool=db_pool_settings, pragmas=db_pragmas)
+        ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+db_executor = ThreadPoolExecutor(max_workers=DB_THREADPOOL_SIZE, thread_name_prefix="waitlist-db")
+
+# Metrics (per worker process, exposed on /metrics)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+metrics = WaitlistMetrics()
+if METRICS_ENABLED:
+    metrics.instrument_engine(engine)
+    metrics.watch_pool("primary", lambda: pool_stats(engine))
+    if async_engine is not None:
+        metrics.instrument_engine(async_engine.sync_engine)
+        metrics.watch_pool("primary_async", lambda: pool_stats(async_engine.sync_engine))
+    if read_engine is not None:
+        metrics.instrument_engine(read_engine)
+        metrics.watch_pool("replica", lambda: pool_stats(read_engine))
+
+profiler = None
+if PROFILING_ENABLED:
+    profiler = RequestProfiler(
+        ProfileStore(PROFILE_DIR, int(PROFILE_MAX_MB * 1024 * 1024)),
+        sample_rate=PROFILE_SAMPLE_RATE,
+        slow_ms=PROFILE_SLOW_MS,
+        interval_ms=PROFILE_INTERVAL_MS
+    )
+    profiler.instrument_engine(engine)
+    if async_engine is not None:
+        profiler.instrument_engine(async_engine.sync_engine)
+    if read_engine is not None:
+        profiler.instrument_engine(read_engine)
+
+# Every cached namespace depends on the waitlist contents, so writes invalidate them all
+CACHED_NAMESPACES = ("stats", "health", "position", "version")
+response_cache = ResponseCache(
+    create_backend(CACHE_URL, CACHE_MAX_ENTRIES),
+    on_lookup=metrics.record_cache_lookup if METRICS_ENABLED else None
+)
+
+signup_limiter = None
+if RATE_LIMIT_ENABLED:
+    signup_limiter = RateLimiter(create_buckets(RATE_LIMIT_URL, RATE_LIMIT_MAX_KEYS), {
+        "ip": parse_limit(RATE_LIMIT_SIGNUP_IP),
+        "subnet": parse_limit(RATE_LIMIT_SIGNUP_SUBNET),
+        "email": parse_limit(RATE_LIMIT_SIGNUP_EMAIL),
+    })
+
 Base = declarative_base()
 
 # Database Models
 class WaitlistEntry(Base):
     __tablename__ = "waitlist_entries"
     
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     email = Column(String, unique=True, index=True, nullable=False)
     source = Column(String, default="website")
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     is_active = Column(Boolean, default=True)
-    position = Column(Integer, nullable=True)
+    # Written by every reactivation and never by an insert
+    reactivated_at = Column(DateTime, nullable=True)
+    position = Column(Integer, nullable=True)  # Held when unsubscribed; active ranks come from compute_position
     ip_address = Column(String, nullable=True)
     user_agent = Column(String, nullable=True)
 
-# Create tables
-Base.metadata.create_all(bind=engine)
+    __table_args__ = (
+        Index("ix_waitlist_entries_order_key", "created_at", "id"),
+        # Active entries in waitlist order: pages, exports and position counts never touch inactive rows
+        Index("ix_waitlist_entries_active_order", "created_at", "id",
+              sqlite_where=is_active == True, postgresql_where=is_active == True),
+        # Per-source active counts and the distinct sources for counter reconciliation
+        Index("ix_waitlist_entries_source_active", "source", "is_active"),
+        # Change feed order for downstream sync
+        Index("ix_waitlist_entries_change_order", "updated_at", "id"),
+        # Inactive entries by last change, for the archiver
+        Index("ix_waitlist_entries_inactive_updated", "updated_at", "id",
+              sqlite_where=is_active == False, postgresql_where=is_active == False),
+    )
+
+class PositionBlock(Base):
+    """Active-entry count for a contiguous run of the waitlist.
+
+    Blocks partition entries by their (created_at, id) order key, so a position is
+    the sum of active counts in earlier blocks plus the rank inside the entry's block.
+    """
+    __tablename__ = "position_blocks"
+
+    id = Column(Integer, primary_key=True)
+    start_created_at = Column(DateTime, nullable=False)
+    start_entry_id = Column(Integer, nullable=False)
+    size = Column(Integer, default=0, nullable=False)
+    active_count = Column(Integer, default=0, nullable=False)
+
+    __table_args__ = (
+        Index("ix_position_blocks_start", "start_created_at", "start_entry_id", unique=True),
+    )
+
+class WaitlistCounter(Base):
+    """Running total maintained in the same transaction as every write"""
+    __tablename__ = "waitlist_counters"
+    
+    name = Column(String, primary_key=True)
+    value = Column(Integer, default=0, nullable=False)
+
+class SignupDaily(Base):
+    """Per-day, per-source rollup of signups, keyed by the entries' created_at day"""
+    __tablename__ = "signups_daily"
+    
+    day = Column(Date, primary_key=True)
+    source = Column(String, primary_key=True)
+    active = Column(Integer, default=0, nullable=False)
+    inactive = Column(Integer, default=0, nullable=False)
+
+class IdempotencyRecord(Base):
+    """Signup responses stored under the client's Idempotency-Key (IDEMPOTENCY_STORE=database)"""
+    __tablename__ = "idempotency_keys"
+    
+    key = Column(String(MAX_KEY_LENGTH), primary_key=True)
+    fingerprint = Column(String(64), nullable=False)
+    # JSON; "null" while the request that claimed the key is still running
+    response = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+class ArchivedEntry(Base):
+    """Inactive entry moved out of waitlist_entries after ARCHIVE_RETENTION_DAYS, under its original id"""
+    __tablename__ = "waitlist_archive"
+    
+    id = Column(Integer, primary_key=True)
+    email = Column(String, unique=True, index=True, nullable=False)
+    source = Column(String)
+    created_at = Column(DateTime)
+    updated_at = Column(DateTime)
+    position = Column(Integer, nullable=True)  # Position held at departure
+    ip_address = Column(String, nullable=True)
+    user_agent = Column(String, nullable=True)
+    archived_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+# Schema migrations, applied in version order (python migrate.py, or at import with AUTO_MIGRATE).
+# Steps that take model tables or indexes ship them as they are at release; change them afterwards
+# only through a new migration.
+
+# What the first release created; migration 1 builds exactly this, whatever the models say now
+baseline_metadata = MetaData()
+baseline_waitlist_entries = Table(
+    "waitlist_entries",
+    baseline_metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("email", String, unique=True, index=True, nullable=False),
+    Column("source", String),
+    Column("created_at", DateTime),
+    Column("updated_at", DateTime),
+    Column("is_active", Boolean),
+    Column("position", Integer, nullable=True),
+    Column("ip_address", String, nullable=True),
+    Column("user_agent", String, nullable=True),
+)
+
+def model_index(model, name: str) -> Index:
+    """An index declared on a model, so migrations create exactly what the model describes"""
+    return next(index for index in model.__table__.indexes if index.name == name)
+
+MIGRATIONS = [
+    Migration(1, "create tables", create_tables(baseline_waitlist_entries)),
+    Migration(2, "waitlist order key index", create_indexes(
+        model_index(WaitlistEntry, "ix_waitlist_entries_order_key")
+    )),
+    Migration(3, "active order and source indexes", create_indexes(
+        model_index(WaitlistEntry, "ix_waitlist_entries_active_order"),
+        model_index(WaitlistEntry, "ix_waitlist_entries_source_active")
+    )),
+    # Duplicates the primary key
+    Migration(4, "drop waitlist id index", drop_indexes("ix_waitlist_entries_id")),
+    Migration(5, "change feed index", create_indexes(
+        model_index(WaitlistEntry, "ix_waitlist_entries_change_order")
+    )),
+    Migration(6, "waitlist archive table", create_tables(ArchivedEntry.__table__)),
+    Migration(7, "inactive entries index", create_indexes(
+        model_index(WaitlistEntry, "ix_waitlist_entries_inactive_updated")
+    )),
+    # Already present where migration 1 used to run create_all on the current models
+    Migration(8, "position, counter, rollup and idempotency tables", create_tables(
+        PositionBlock.__table__, WaitlistCounter.__table__, SignupDaily.__table__, IdempotencyRecord.__table__
+    )),
+    Migration(9, "waitlist reactivated_at column", add_columns(WaitlistEntry.__table__, "reactivated_at")),
+]
+
+if AUTO_MIGRATE:
+    run_migrations(engine, MIGRATIONS)
+
+EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
+def normalize_email(email: str) -> str:
+    """Stored form of an address, raising ValueError when it fails the signup format check"""
+    email = email.strip()
+    if not EMAIL_PATTERN.match(email):
+        raise ValueError('Invalid email format')
+    return email.lower()
 
 # Pydantic Models
 class WaitlistSignupRequest(BaseModel):
@@ -41,10 +412,7 @@ class WaitlistSignupRequest(BaseModel):
     
     @validator('email')
     def validate_email_format(cls, v):
-        email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        if not re.match(email_pattern, str(v)):
-            raise ValueError('Invalid email format')
-        return str(v).lower().strip()
+        return normalize_email(str(v))
     
     @validator('source')
     def validate_source(cls, v):
@@ -53,6 +421,9 @@ class WaitlistSignupRequest(BaseModel):
             raise ValueError(f'Source must be one of: {", ".join(allowed_sources)}')
         return v
 
+class PositionLookupRequest(BaseModel):
+    emails: List[str] = Field(..., min_length=1, max_length=POSITION_LOOKUP_MAX_EMAILS)
+
 class WaitlistResponse(BaseModel):
     success: bool
     message: str
@@ -69,6 +440,18 @@ class WaitlistStats(BaseModel):
     average_daily_signups: float
     top_sources: List[dict]
 
+class TimeseriesPoint(BaseModel):
+    bucket_start: date
+    signups: int
+    active: int
+    inactive: int
+
+class WaitlistTimeseries(BaseModel):
+    bucket: str
+    start: date
+    end: date
+    points: List[TimeseriesPoint]
+
 class WaitlistEntryResponse(BaseModel):
     id: int
     email: str
@@ -87,13 +470,91 @@ class HealthResponse(BaseModel):
     total_entries: int
     version: str
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Prepare derived structures before serving traffic"""
+    db = open_session()
+    try:
+        await db.run_sync(ensure_position_blocks)
+        await db.run_sync(ensure_counters)
+        await db.run_sync(ensure_signups_daily)
+    finally:
+        await db.close()
+    
+    await warm_database_pools()
+    
+    if EMAIL_INDEX_ENABLED:
+        await rebuild_email_index()
+    
+    reconcile_task = None
+    if COUNTERS_RECONCILE_SECONDS > 0:
+        reconcile_task = asyncio.create_task(reconcile_counters_periodically(COUNTERS_RECONCILE_SECONDS))
+    archive_task = None
+    if ARCHIVE_INTERVAL_SECONDS > 0:
+        archive_task = asyncio.create_task(archive_inactive_periodically(ARCHIVE_INTERVAL_SECONDS))
+    
+    global signup_queue
+    if SIGNUP_WRITE_QUEUE:
+        signup_queue = GroupCommitQueue(
+            flush_signup_batch,
+            max_batch=SIGNUP_BATCH_SIZE,
+            max_delay_ms=SIGNUP_BATCH_DELAY_MS,
+            max_pending=SIGNUP_QUEUE_LIMIT
+        )
+        signup_queue.start()
+    
+    if profiler is not None:
+        profiler.sampler.start()
+    
+    live_feed.start()
+    if read_router is not None:
+        await read_router.start()
+    end_streams_on_exit()
+    report_worker_ready()
+    
+    yield
+    
+    await live_feed.stop()
+    if read_router is not None:
+        await read_router.stop()
+    
+    if email_index_task is not None and not email_index_task.done():
+        email_index_task.cancel()
+        try:
+            await email_index_task
+        except asyncio.CancelledError:
+            pass
+    
+    # Accepted signups are flushed before the database goes away
+    if signup_queue is not None:
+        await signup_queue.drain()
+        signup_queue = None
+    
+    if reconcile_task is not None:
+        reconcile_task.cancel()
+    if archive_task is not None:
+        archive_task.cancel()
+    
+    if profiler is not None:
+        profiler.sampler.stop()
+    
+    await response_cache.close()
+    if signup_limiter is not None:
+        await signup_limiter.close()
+    if async_engine is not None:
+        await async_engine.dispose()
+    if read_async_engine is not None:
+        await read_async_engine.dispose()
+    db_executor.shutdown(wait=True)
+
 # FastAPI app initialization
 app = FastAPI(
     title="SiikHub Waitlist API",
     description="Professional waitlist management system for SiikHub platform",
     version="2.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -108,28 +569,634 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "Idempotent-Replayed"],
 )
 
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware, metrics=metrics)
+
+if profiler is not None:
+    app.add_middleware(ProfilerMiddleware, profiler=profiler)
+
 # Database dependency
-def get_db():
-    db = SessionLocal()
+class ThreadedSession:
+    """Sync Session driven from the bounded DB threadpool.
+
+    Mirrors AsyncSession.run_sync/close so endpoints are written once for both modes.
+    """
+    
+    def __init__(self, session: Session):
+        self.sync_session = session
+    
+    async def run_sync(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        # Carry the caller's context (e.g. per-request SQL stats) into the worker thread
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(
+            db_executor, context.run, call_in_capture, partial(fn, self.sync_session, *args, **kwargs)
+        )
+    
+    async def close(self):
+        loop = asyncio.get_running_loop()
+        # Not queued behind DB work: when every DB thread is waiting on the pool, the
+        # connections they wait for are the ones held by sessions waiting to close
+        await loop.run_in_executor(None, self.sync_session.close)
+
+AsyncDB = Union[AsyncSession, ThreadedSession]
+
+def open_session(replica: bool = False) -> AsyncDB:
+    """Open an AsyncSession when the database URL names an async driver, else a threaded one"""
+    if replica:
+        session = ReadSessionLocal()
+        return session if isinstance(session, AsyncSession) else ThreadedSession(session)
+    if USE_ASYNC_DB:
+        return AsyncSessionLocal()
+    return ThreadedSession(SessionLocal())
+
+async def run_detached(fn, *args, replica: bool = False):
+    """Run a sync DB function on a session of its own, independent of any request"""
+    db = open_session(replica)
+    try:
+        return await db.run_sync(fn, *args)
+    finally:
+        await db.close()
+
+async def run_read(fn, *args, version: int, sticky: tuple = ()):
+    """run_detached on the read replica when read_router allows it, else (or if it fails) the primary"""
+    if read_router is not None and read_router.use_replica(version, sticky):
+        try:
+            return await run_detached(fn, *args, replica=True)
+        except DBAPIError as e:
+            read_router.mark_failed(e)
+    return await run_detached(fn, *args)
+
+async def open_read_cursor(fn, *args, version: int, sticky: tuple = ()):
+    """(session, result) for a read that outlives the call, such as a streamed export; routed like run_read"""
+    if read_router is not None and read_router.use_replica(version, sticky):
+        db = open_session(replica=True)
+        try:
+            return db, await db.run_sync(fn, *args)
+        except DBAPIError as e:
+            read_router.mark_failed(e)
+            await db.close()
+    db = open_session()
+    try:
+        return db, await db.run_sync(fn, *args)
+    except Exception:
+        await db.close()
+        raise
+
+def sticky_keys(request: Request, email: Optional[str] = None) -> tuple:
+    """Keys that tie a read to the client's own recent writes"""
+    return (request.cookies.get(READ_REPLICA_STICKY_COOKIE), email)
+
+def issue_sticky_token(request: Request, response: Response) -> Optional[str]:
+    """The client's read-your-writes token, set (or renewed) as a cookie on a write it makes"""
+    if read_router is None:
+        return None
+    token = request.cookies.get(READ_REPLICA_STICKY_COOKIE)
+    if not token or len(token) > 64:
+        token = secrets.token_urlsafe(16)
+    response.set_cookie(
+        READ_REPLICA_STICKY_COOKIE, token, max_age=max(1, math.ceil(READ_REPLICA_STICKY_SECONDS)),
+        httponly=True, samesite="lax"
+    )
+    return token
+
+async def invalidate_cached_reads():
+    await response_cache.invalidate(*CACHED_NAMESPACES)
+
+async def current_version() -> int:
+    """Waitlist version, cached for CACHE_TTL_VERSION and dropped on this worker's writes.
+
+    Cached reads are keyed by it, so a body is never older than the version it is served with.
+    """
+    return await response_cache.get_or_compute(
+        "version", "current", CACHE_TTL_VERSION, lambda: run_detached(read_version)
+    )
+
+def version_etag(version: int, *variant) -> str:
+    """Weak ETag for a waitlist version plus anything else the body depends on"""
+    return 'W/"' + "-".join(str(part) for part in (version,) + variant) + '"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match check using weak comparison"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [candidate.strip() for candidate in header.split(",")]
+    return "*" in candidates or any(candidate.removeprefix("W/") == etag.removeprefix("W/") for candidate in candidates)
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
+
+async def get_db():
+    db = open_session()
     try:
         yield db
     finally:
-        db.close()
+        await db.close()
 
-# Utility functions
-def update_positions(db: Session):
-    """Update position numbers for all active entries"""
-    active_entries = db.query(WaitlistEntry).filter(
+# Position engine
+# Entries are passed as WaitlistEntry objects or any row exposing created_at and id.
+POSITION_BLOCK_SIZE = int(os.getenv("POSITION_BLOCK_SIZE", "1024"))
+
+# Both filters repeat the created_at bound outside the OR: planners walking the order
+# index to satisfy an ORDER BY only seek with a plain range, otherwise they scan from the start.
+def key_before(created_col, id_col, created_at, entry_id, inclusive=False):
+    """SQL filter for rows ordered before (created_at, entry_id)"""
+    tie = id_col <= entry_id if inclusive else id_col < entry_id
+    return and_(created_col <= created_at, or_(created_col < created_at, and_(created_col == created_at, tie)))
+
+def key_after(created_col, id_col, created_at, entry_id, inclusive=False):
+    """SQL filter for rows ordered after (created_at, entry_id)"""
+    tie = id_col >= entry_id if inclusive else id_col > entry_id
+    return and_(created_col >= created_at, or_(created_col > created_at, and_(created_col == created_at, tie)))
+
+def find_block(db: Session, entry: WaitlistEntry):
+    """Return the block whose key range contains the entry, if any"""
+    return db.query(PositionBlock).filter(
+        key_before(PositionBlock.start_created_at, PositionBlock.start_entry_id,
+                   entry.created_at, entry.id, inclusive=True)
+    ).order_by(
+        PositionBlock.start_created_at.desc(), PositionBlock.start_entry_id.desc()
+    ).first()
+
+def adjust_block(db: Session, block_id: int, active_delta: int, size_delta: int = 0):
+    """Apply counter deltas to a block with an atomic in-database increment"""
+    db.query(PositionBlock).filter(PositionBlock.id == block_id).update({
+        PositionBlock.active_count: PositionBlock.active_count + active_delta,
+        PositionBlock.size: PositionBlock.size + size_delta,
+    }, synchronize_session=False)
+
+def track_new_entry(db: Session, entry: WaitlistEntry):
+    """Account for a freshly inserted (flushed) active entry in O(1) statements, amortized over splits"""
+    block = find_block(db, entry)
+    
+    if block is None:
+        # Entry sorts before every block (or there are none yet): the first block
+        # can simply start earlier, since nothing precedes its old start.
+        block = db.query(PositionBlock).order_by(
+            PositionBlock.start_created_at.asc(), PositionBlock.start_entry_id.asc()
+        ).first()
+        if block is None:
+            db.add(PositionBlock(
+                start_created_at=entry.created_at, start_entry_id=entry.id,
+                size=1, active_count=1
+            ))
+            db.flush()
+            return
+        block.start_created_at = entry.created_at
+        block.start_entry_id = entry.id
+        db.flush()
+    elif block.size >= POSITION_BLOCK_SIZE:
+        has_later = db.query(WaitlistEntry.id).filter(
+            key_after(WaitlistEntry.created_at, WaitlistEntry.id, entry.created_at, entry.id)
+        ).first()
+        if has_later is None:
+            # Appending at the tail of a full block opens a new one
+            db.add(PositionBlock(
+                start_created_at=entry.created_at, start_entry_id=entry.id,
+                size=1, active_count=1
+            ))
+            db.flush()
+            return
+    
+    grow_block(db, block, active_delta=1)
+
+def grow_block(db: Session, block: PositionBlock, active_delta: int):
+    """Count one more entry in a block, splitting it once a mid-waitlist insert overfills it"""
+    adjust_block(db, block.id, active_delta=active_delta, size_delta=1)
+    if block.size >= POSITION_BLOCK_SIZE:
+        split_block(db, block)
+
+def split_block(db: Session, block: PositionBlock):
+    """Halve a block at its middle entry, recounting both halves from the table"""
+    next_start = db.query(PositionBlock.start_created_at, PositionBlock.start_entry_id).filter(
+        key_after(PositionBlock.start_created_at, PositionBlock.start_entry_id,
+                  block.start_created_at, block.start_entry_id)
+    ).order_by(
+        PositionBlock.start_created_at.asc(), PositionBlock.start_entry_id.asc()
+    ).first()
+    
+    members = db.query(WaitlistEntry.created_at, WaitlistEntry.id, WaitlistEntry.is_active).filter(
+        key_after(WaitlistEntry.created_at, WaitlistEntry.id,
+                  block.start_created_at, block.start_entry_id, inclusive=True)
+    )
+    if next_start is not None:
+        members = members.filter(key_before(WaitlistEntry.created_at, WaitlistEntry.id, *next_start))
+    rows = members.order_by(WaitlistEntry.created_at.asc(), WaitlistEntry.id.asc()).all()
+    if len(rows) < 2:
+        return
+    
+    lower, upper = rows[:len(rows) // 2], rows[len(rows) // 2:]
+    db.query(PositionBlock).filter(PositionBlock.id == block.id).update({
+        PositionBlock.size: len(lower),
+        PositionBlock.active_count: sum(1 for row in lower if row.is_active),
+    }, synchronize_session=False)
+    db.add(PositionBlock(
+        start_created_at=upper[0].created_at, start_entry_id=upper[0].id,
+        size=len(upper), active_count=sum(1 for row in upper if row.is_active)
+    ))
+    db.flush()
+
+def track_new_entries(db: Session, entries: list):
+    """Account for a batch of freshly inserted active entries, sorted by order key.
+
+    A batch landing at the tail of the waitlist tops up the last block and opens
+    new full blocks, costing O(len/POSITION_BLOCK_SIZE) statements; anything
+    else falls back to per-entry tracking.
+    """
+    if not entries:
+        return
+    
+    first = entries[0]
+    at_or_after_first = db.query(func.count(WaitlistEntry.id)).filter(
+        key_after(WaitlistEntry.created_at, WaitlistEntry.id, first.created_at, first.id, inclusive=True)
+    ).scalar()
+    block = find_block(db, first)
+    
+    if at_or_after_first != len(entries) or (block is None and db.query(PositionBlock.id).first() is not None):
+        for entry in entries:
+            track_new_entry(db, entry)
+        return
+    
+    remaining = list(entries)
+    if block is not None and block.size < POSITION_BLOCK_SIZE:
+        room = POSITION_BLOCK_SIZE - block.size
+        taken, remaining = remaining[:room], remaining[room:]
+        adjust_block(db, block.id, active_delta=len(taken), size_delta=len(taken))
+    
+    for start in range(0, len(remaining), POSITION_BLOCK_SIZE):
+        chunk = remaining[start:start + POSITION_BLOCK_SIZE]
+        db.add(PositionBlock(
+            start_created_at=chunk[0].created_at, start_entry_id=chunk[0].id,
+            size=len(chunk), active_count=len(chunk)
+        ))
+    db.flush()
+
+def track_activation(db: Session, entry: WaitlistEntry, active_delta: int):
+    """Account for an entry switching between active and inactive"""
+    block = find_block(db, entry)
+    if block is None:
+        rebuild_position_blocks(db)
+        return
+    adjust_block(db, block.id, active_delta=active_delta)
+
+def compute_position(db: Session, entry: WaitlistEntry) -> int:
+    """1-based rank of an active entry among active entries by signup time"""
+    block = find_block(db, entry)
+    if block is None:
+        return db.query(func.count(WaitlistEntry.id)).filter(
+            WaitlistEntry.is_active == True,
+            key_before(WaitlistEntry.created_at, WaitlistEntry.id, entry.created_at, entry.id)
+        ).scalar() + 1
+    
+    ahead_in_earlier_blocks = db.query(
+        func.coalesce(func.sum(PositionBlock.active_count), 0)
+    ).filter(
+        key_before(PositionBlock.start_created_at, PositionBlock.start_entry_id,
+                   block.start_created_at, block.start_entry_id)
+    ).scalar()
+    
+    ahead_in_block = db.query(func.count(WaitlistEntry.id)).filter(
+        WaitlistEntry.is_active == True,
+        key_after(WaitlistEntry.created_at, WaitlistEntry.id,
+                  block.start_created_at, block.start_entry_id, inclusive=True),
+        key_before(WaitlistEntry.created_at, WaitlistEntry.id, entry.created_at, entry.id)
+    ).scalar()
+    
+    return ahead_in_earlier_blocks + ahead_in_block + 1
+
+def rebuild_position_blocks(db: Session):
+    """Recreate the block index from scratch with one ordered pass over the table"""
+    started = time.perf_counter()
+    db.query(PositionBlock).delete(synchronize_session=False)
+    
+    rows = db.query(
+        WaitlistEntry.created_at, WaitlistEntry.id, WaitlistEntry.is_active
+    ).order_by(
+        WaitlistEntry.created_at.asc(), WaitlistEntry.id.asc()
+    ).yield_per(POSITION_BLOCK_SIZE)
+    
+    block = None
+    for created_at, entry_id, is_active in rows:
+        if block is None or block.size >= POSITION_BLOCK_SIZE:
+            block = PositionBlock(
+                start_created_at=created_at, start_entry_id=entry_id,
+                size=0, active_count=0
+            )
+            db.add(block)
+        block.size += 1
+        if is_active:
+            block.active_count += 1
+    
+    db.flush()
+    metrics.observe_operation("position_blocks_rebuild", time.perf_counter() - started)
+
+def ensure_position_blocks(db: Session):
+    """Build the block index on first start against an existing table"""
+    if db.query(PositionBlock.id).first() is None and db.query(WaitlistEntry.id).first() is not None:
+        rebuild_position_blocks(db)
+        db.commit()
+
+# Counters
+# Every signup, archived entries included, like the signups_daily rollup
+COUNTER_TOTAL = "total"
+COUNTER_ACTIVE = "active"
+# Bumped in the same transaction as every change to the waitlist; drives ETags
+COUNTER_VERSION = "version"
+# Bumped by every write that moves active entries' positions: departures and rejoins, never appends
+COUNTER_REORDERS = "reorders"
+SOURCE_COUNTER_PREFIX = "active_source:"
+
+def dialect_insert(db: Session, model):
+    """Return the dialect-specific insert() for the session, which supports ON CONFLICT"""
+    dialect_inserts = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+    dialect_name = db.get_bind().dialect.name
+    if dialect_name not in dialect_inserts:
+        raise RuntimeError(f"Unsupported database dialect: {dialect_name}")
+    return dialect_inserts[dialect_name](model)
+
+def bump_counters(db: Session, deltas: dict):
+    """Atomically add deltas to named counters in one statement, creating missing rows"""
+    rows = [{"name": name, "value": delta} for name, delta in sorted(deltas.items()) if delta]
+    if not rows:
+        return
+    
+    # Rows are sorted so concurrent writers lock counters in the same order
+    stmt = dialect_insert(db, WaitlistCounter).values(rows)
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=[WaitlistCounter.name],
+        set_={"value": WaitlistCounter.value + stmt.excluded.value}
+    ))
+
+def read_counters(db: Session) -> dict:
+    """Load every counter with a single small-table read"""
+    return dict(db.query(WaitlistCounter.name, WaitlistCounter.value).all())
+
+def read_version(db: Session) -> int:
+    """Current waitlist version (0 before the first write)"""
+    value = db.query(WaitlistCounter.value).filter(WaitlistCounter.name == COUNTER_VERSION).scalar()
+    return value or 0
+
+def active_source_counts(counters: dict) -> dict:
+    """Per-source active counts from a read_counters() snapshot"""
+    return {
+        name[len(SOURCE_COUNTER_PREFIX):]: value
+        for name, value in counters.items()
+        if name.startswith(SOURCE_COUNTER_PREFIX)
+    }
+
+def count_active(db: Session) -> int:
+    """Active entries, read from the maintained counter"""
+    return db.query(WaitlistCounter.value).filter(
+        WaitlistCounter.name == COUNTER_ACTIVE
+    ).scalar() or 0
+
+def reconcile_counters(db: Session):
+    """Recompute every counter from waitlist_entries and the archive to repair drift.
+
+    Counter rows are created first and locked in the order writers bump them.
+    The UPDATE that rewrites them from the table's counts then starts after every
+    increment it could overwrite has committed (READ COMMITTED gives each statement
+    a fresh snapshot), and increments from writers still in flight wait for it.
+    """
+    sources = [source for (source,) in db.query(WaitlistEntry.source).distinct()]
+    names = [COUNTER_TOTAL, COUNTER_ACTIVE] + [SOURCE_COUNTER_PREFIX + source for source in sources]
+    
+    stmt = dialect_insert(db, WaitlistCounter).values([{"name": name, "value": 0} for name in sorted(names)])
+    db.execute(stmt.on_conflict_do_nothing(index_elements=[WaitlistCounter.name]))
+    # SQLite has no row locks, but the INSERT above already holds its single write lock
+    db.query(WaitlistCounter.name).order_by(WaitlistCounter.name).with_for_update().all()
+    
+    total = db.query(func.count(WaitlistEntry.id)).scalar_subquery() + \
+        db.query(func.count(ArchivedEntry.id)).scalar_subquery()
+    active = db.query(func.count(WaitlistEntry.id)).filter(
         WaitlistEntry.is_active == True
-    ).order_by(WaitlistEntry.created_at.asc()).all()
+    ).scalar_subquery()
+    active_for_source = db.query(func.count(WaitlistEntry.id)).filter(
+        WaitlistEntry.is_active == True,
+        # Compared on the bare column so the lookup can use the (source, is_active) index
+        WaitlistEntry.source == func.substr(WaitlistCounter.name, len(SOURCE_COUNTER_PREFIX) + 1)
+    ).scalar_subquery()
     
-    for i, entry in enumerate(active_entries, 1):
-        entry.position = i
+    db.query(WaitlistCounter).update({
+        WaitlistCounter.value: case(
+            (WaitlistCounter.name == COUNTER_TOTAL, total),
+            (WaitlistCounter.name == COUNTER_ACTIVE, active),
+            (WaitlistCounter.name == COUNTER_VERSION, WaitlistCounter.value),
+            (WaitlistCounter.name == COUNTER_REORDERS, WaitlistCounter.value),
+            else_=active_for_source
+        )
+    }, synchronize_session=False)
+    db.commit()
+
+def ensure_counters(db: Session):
+    """Seed the counters on first start against an existing table"""
+    if db.query(WaitlistCounter.name).first() is None:
+        reconcile_counters(db)
+
+async def reconcile_counters_periodically(interval: float):
+    """Background job that repairs counter drift every interval seconds"""
+    while True:
+        await asyncio.sleep(interval)
+        db = open_session()
+        try:
+            await db.run_sync(reconcile_counters)
+        except Exception as e:
+            print(f"⚠️  Counter reconcile failed: {e}")
+        finally:
+            await db.close()
+
+# Daily rollup
+def bump_signups_daily(db: Session, deltas: dict):
+    """Apply {(day, source): (active_delta, inactive_delta)} to the rollup in one statement"""
+    rows = [
+        {"day": day, "source": source, "active": active, "inactive": inactive}
+        for (day, source), (active, inactive) in sorted(deltas.items())
+        if active or inactive
+    ]
+    if not rows:
+        return
+    
+    stmt = dialect_insert(db, SignupDaily).values(rows)
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=[SignupDaily.day, SignupDaily.source],
+        set_={
+            "active": SignupDaily.active + stmt.excluded.active,
+            "inactive": SignupDaily.inactive + stmt.excluded.inactive,
+        }
+    ))
+
+def rebuild_signups_daily(db: Session):
+    """Regenerate the rollup from waitlist_entries and the archive with one INSERT ... SELECT"""
+    signups = union_all(
+        select(WaitlistEntry.created_at, WaitlistEntry.source, WaitlistEntry.is_active),
+        select(ArchivedEntry.created_at, ArchivedEntry.source, false())
+    ).subquery()
+    day = func.date(signups.c.created_at)
+    grouped = select(
+        day,
+        signups.c.source,
+        func.sum(case((signups.c.is_active == True, 1), else_=0)),
+        func.sum(case((signups.c.is_active == True, 0), else_=1)),
+    ).group_by(day, signups.c.source)
     
+    db.query(SignupDaily).delete(synchronize_session=False)
+    db.execute(SignupDaily.__table__.insert().from_select(
+        ["day", "source", "active", "inactive"], grouped
+    ))
     db.commit()
 
+def ensure_signups_daily(db: Session):
+    """Build the rollup on first start against an existing table"""
+    if db.query(SignupDaily.day).first() is None and db.query(WaitlistEntry.id).first() is not None:
+        rebuild_signups_daily(db)
+
+# Archive
+ARCHIVED_COLUMNS = ("id", "email", "source", "created_at", "updated_at", "position", "ip_address", "user_agent")
+
+def archive_inactive_batch(db: Session, cutoff: datetime, limit: int) -> int:
+    """Move up to limit entries inactive since before cutoff into waitlist_archive in one transaction"""
+    ids = db.execute(
+        select(WaitlistEntry.id).where(
+            WaitlistEntry.is_active == False,
+            WaitlistEntry.updated_at < cutoff
+        ).order_by(WaitlistEntry.updated_at.asc(), WaitlistEntry.id.asc()).limit(limit)
+    ).scalars().all()
+    if not ids:
+        return 0
+    
+    # is_active is checked again so an entry reactivated since the SELECT stays where it is
+    rows = db.execute(
+        delete(WaitlistEntry).where(
+            WaitlistEntry.id.in_(ids),
+            WaitlistEntry.is_active == False
+        ).returning(*(getattr(WaitlistEntry, column) for column in ARCHIVED_COLUMNS))
+    ).all()
+    if not rows:
+        db.rollback()
+        return 0
+    
+    # Bulk imports used to bring archived emails back without removing their archive row
+    db.execute(delete(ArchivedEntry).where(ArchivedEntry.email.in_([row.email for row in rows])))
+    archived_at = datetime.utcnow()
+    db.execute(ArchivedEntry.__table__.insert(), [
+        {**row._mapping, "archived_at": archived_at} for row in rows
+    ])
+    
+    # Archived entries were inactive, so blocks only shrink; emptied blocks keep their key range
+    blocks = db.execute(
+        select(PositionBlock.id, PositionBlock.start_created_at, PositionBlock.start_entry_id).order_by(
+            PositionBlock.start_created_at.asc(), PositionBlock.start_entry_id.asc()
+        )
+    ).all()
+    block_starts = [(block.start_created_at, block.start_entry_id) for block in blocks]
+    removed = {}
+    for row in rows:
+        index = bisect_right(block_starts, (row.created_at, row.id)) - 1
+        if index >= 0:
+            removed[blocks[index].id] = removed.get(blocks[index].id, 0) + 1
+    for block_id, count in sorted(removed.items()):
+        adjust_block(db, block_id, active_delta=0, size_delta=-count)
+    
+    # Archived entries keep counting towards the total, as they do in the rollup
+    bump_counters(db, {COUNTER_VERSION: 1})
+    db.commit()
+    return len(rows)
+
+def archive_inactive_entries(db: Session, cutoff: datetime, batch_size: int = ARCHIVE_BATCH_SIZE) -> int:
+    """Archive every entry inactive since before cutoff, batch by batch, and return how many moved"""
+    archived = 0
+    while True:
+        moved = archive_inactive_batch(db, cutoff, batch_size)
+        if not moved:
+            return archived
+        archived += moved
+
+def restore_archived_entry(db: Session, entry_id: int, email: str):
+    """Give a freshly inserted entry back the signup time and source of its archived predecessor.
+
+    Returns the entry's (id, created_at, source) row, or None when the email was never archived.
+    """
+    archived = db.execute(
+        delete(ArchivedEntry).where(ArchivedEntry.email == email).returning(
+            ArchivedEntry.created_at, ArchivedEntry.source
+        )
+    ).first()
+    if archived is None:
+        return None
+    
+    row = db.execute(
+        update(WaitlistEntry).where(WaitlistEntry.id == entry_id).values(
+            created_at=archived.created_at, source=archived.source, reactivated_at=datetime.utcnow()
+        ).returning(WaitlistEntry.id, WaitlistEntry.created_at, WaitlistEntry.source)
+    ).one()
+    # The row is already active, so its block counts it like any new entry; the total already
+    # includes it from its time in the archive
+    track_new_entry(db, row)
+    return row
+
+async def archive_inactive_periodically(interval: float):
+    """Background job that archives entries past ARCHIVE_RETENTION_DAYS every interval seconds"""
+    while True:
+        await asyncio.sleep(interval)
+        db = open_session()
+        try:
+            cutoff = datetime.utcnow() - timedelta(days=ARCHIVE_RETENTION_DAYS)
+            if await db.run_sync(archive_inactive_entries, cutoff):
+                await invalidate_cached_reads()
+        except Exception as e:
+            print(f"⚠️  Archiving failed: {e}")
+        finally:
+            await db.close()
+
+# Utility functions
+def with_live_positions(db: Session, entries: List[WaitlistEntry]) -> List[WaitlistEntryResponse]:
+    """Attach live positions to a page of entries sorted by signup time"""
+    results = []
+    next_position = None
+    
+    for entry in entries:
+        item = WaitlistEntryResponse.model_validate(entry)
+        if entry.is_active:
+            if next_position is None:
+                next_position = compute_position(db, entry)
+            item.position = next_position
+            next_position += 1
+        results.append(item)
+    
+    return results
+
+def export_positions(entries: List[WaitlistEntry]) -> List[Optional[int]]:
+    """Positions for a full export sorted by signup time (inactive rows report the one held when they left)"""
+    positions = []
+    next_position = 1
+    
+    for entry in entries:
+        if entry.is_active:
+            positions.append(next_position)
+            next_position += 1
+        else:
+            positions.append(entry.position)
+    
+    return positions
+
+def encode_cursor(created_at: datetime, entry_id: int) -> str:
+    """Opaque pagination cursor for the (created_at, id) order key"""
+    raw = f"{created_at.isoformat()}|{entry_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str):
+    """Inverse of encode_cursor; raises ValueError for anything malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        created_at, entry_id = raw.split("|")
+        return datetime.fromisoformat(created_at), int(entry_id)
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+
 def get_client_info(request: Request):
     """Extract client information from request"""
     return {
@@ -137,6 +1204,1052 @@ def get_client_info(request: Request):
         "user_agent": request.headers.get("user-agent", "")[:500]
     }
 
+# Waitlist operations (sync bodies, executed through run_sync)
+def count_all_entries(db: Session) -> int:
+    """Total entries from the maintained counter; doubles as a database liveness probe"""
+    return db.query(WaitlistCounter.value).filter(
+        WaitlistCounter.name == COUNTER_TOTAL
+    ).scalar() or 0
+
+def signup_upsert(db: Session, signup_data: WaitlistSignupRequest, client_info: dict, now: datetime):
+    """Build the INSERT ... ON CONFLICT ... RETURNING statement for the session's dialect.
+
+    A new email is inserted and an inactive one is reactivated in place; an email
+    that is already active matches the conflict but not the WHERE, so no row comes back.
+    A reactivation leaves source alone so RETURNING reports the previous one, and
+    stamps reactivated_at, which an insert never sets.
+    """
+    stmt = dialect_insert(db, WaitlistEntry).values(
+        email=signup_data.email,
+        source=signup_data.source,
+        created_at=now,
+        updated_at=now,
+        is_active=True,
+        **client_info
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=[WaitlistEntry.email],
+        set_={
+            "is_active": True,
+            "updated_at": stmt.excluded.updated_at,
+            "reactivated_at": stmt.excluded.updated_at,
+        },
+        where=WaitlistEntry.is_active == False
+    ).returning(WaitlistEntry.id, WaitlistEntry.created_at, WaitlistEntry.source, WaitlistEntry.reactivated_at)
+
+def apply_signup(db: Session, signup_data: WaitlistSignupRequest, client_info: dict) -> WaitlistResponse:
+    """Insert, reactivate or report an existing waitlist entry without committing"""
+    now = datetime.utcnow()
+    row = db.execute(signup_upsert(db, signup_data, client_info, now)).first()
+    
+    if row is None:
+        # Already active: the upsert wrote nothing
+        existing_entry = db.query(WaitlistEntry).filter(
+            WaitlistEntry.email == signup_data.email
+        ).first()
+        return already_on_waitlist(db, existing_entry)
+    
+    # Tested here rather than as IS NOT NULL in RETURNING, which SQLite 3.40 gets wrong for added columns
+    reactivated = row.reactivated_at is not None
+    restored = False
+    if not reactivated:
+        archived = restore_archived_entry(db, row.id, signup_data.email)
+        if archived is not None:
+            row, reactivated, restored = archived, True, True
+    day = row.created_at.date()
+    if reactivated:
+        if row.source != signup_data.source:
+            db.query(WaitlistEntry).filter(WaitlistEntry.id == row.id).update(
+                {WaitlistEntry.source: signup_data.source}, synchronize_session=False
+            )
+        if not restored:
+            track_activation(db, row, active_delta=1)
+        bump_counters(db, {
+            COUNTER_ACTIVE: 1, COUNTER_VERSION: 1, COUNTER_REORDERS: 1, SOURCE_COUNTER_PREFIX + signup_data.source: 1
+        })
+        rollup = {(day, row.source): [0, -1]}
+        rollup.setdefault((day, signup_data.source), [0, 0])[0] += 1
+        bump_signups_daily(db, rollup)
+    else:
+        track_new_entry(db, row)
+        bump_counters(db, {
+            COUNTER_TOTAL: 1, COUNTER_ACTIVE: 1, COUNTER_VERSION: 1, SOURCE_COUNTER_PREFIX + signup_data.source: 1
+        })
+        bump_signups_daily(db, {(day, signup_data.source): (1, 0)})
+    
+    position = compute_position(db, row)
+    total_active = count_active(db)
+    
+    if reactivated:
+        message = f"🎉 Welcome back! You're #{position} on the SiikHub waitlist."
+    else:
+        message = f"🎉 You're in! You're #{position} on the SiikHub waitlist. We'll notify you when we launch!"
+    
+    return WaitlistResponse(
+        success=True,
+        message=message,
+        email=signup_data.email,
+        position=position,
+        total_signups=total_active
+    )
+
+def already_on_waitlist(db: Session, entry: WaitlistEntry) -> WaitlistResponse:
+    """Response for a signup whose email is already actively waiting"""
+    return WaitlistResponse(
+        success=False,
+        message="You're already on our waitlist! We'll notify you when SiikHub launches.",
+        email=entry.email,
+        position=compute_position(db, entry),
+        total_signups=count_active(db)
+    )
+
+def lookup_repeat_signup(db: Session, email: str) -> Optional[WaitlistResponse]:
+    """Answer a repeat signup read-only, or None when the email is not actually active"""
+    entry = db.query(WaitlistEntry).filter(
+        WaitlistEntry.email == email,
+        WaitlistEntry.is_active == True
+    ).first()
+    return already_on_waitlist(db, entry) if entry else None
+
+def register_signup(db: Session, signup_data: WaitlistSignupRequest, client_info: dict) -> WaitlistResponse:
+    """Apply one signup in its own transaction.
+
+    Duplicates commit too, so the upsert's write lock is released straight away
+    rather than when the session is closed.
+    """
+    response = apply_signup(db, signup_data, client_info)
+    db.commit()
+    return response
+
+def register_signup_batch(db: Session, items: list) -> list:
+    """Apply queued (signup_data, client_info) pairs in one transaction.
+
+    If the batch fails as a whole it is retried one signup per transaction, so a
+    single bad item only fails its own request.
+    """
+    try:
+        responses = [apply_signup(db, signup_data, client_info) for signup_data, client_info in items]
+        db.commit()
+        return responses
+    except Exception:
+        db.rollback()
+    
+    results = []
+    for signup_data, client_info in items:
+        try:
+            results.append(register_signup(db, signup_data, client_info))
+        except Exception as e:
+            db.rollback()
+            results.append(e)
+    return results
+
+def collect_stats(db: Session) -> WaitlistStats:
+    """Compute /api/waitlist/stats from the counters and the daily rollup.
+
+    Totals and per-source counts come from the counters, like /health and the live
+    feed; the rollup only answers the time windows, which are whole UTC days: the
+    7- and 30-day windows start at midnight of the day the cutoff falls on.
+    """
+    today = datetime.utcnow().date()
+    week_ago = today - timedelta(days=7)
+    thirty_days_ago = today - timedelta(days=30)
+    signups = SignupDaily.active + SignupDaily.inactive
+    
+    window = db.query(
+        func.coalesce(func.sum(case((SignupDaily.day >= week_ago, SignupDaily.active), else_=0)), 0).label('recent'),
+        func.coalesce(func.sum(case((SignupDaily.day >= today, signups), else_=0)), 0).label('today'),
+        func.coalesce(func.sum(signups), 0).label('last_30_days'),
+    ).filter(SignupDaily.day >= thirty_days_ago).one()
+    
+    # Basic counts
+    counters = read_counters(db)
+    total_signups = counters.get(COUNTER_TOTAL, 0)
+    active_signups = counters.get(COUNTER_ACTIVE, 0)
+    inactive_signups = total_signups - active_signups
+    
+    # Recent (last 7 days), today's and average daily (last 30 days) signups
+    recent_signups = window.recent
+    today_signups = window.today
+    average_daily_signups = window.last_30_days / 30.0
+    
+    # Top sources
+    source_counts = sorted(
+        ((source, count) for source, count in active_source_counts(counters).items() if count > 0),
+        key=lambda item: (-item[1], item[0])
+    )
+    top_sources = [{"source": source, "count": count} for source, count in source_counts[:5]]
+    
+    return WaitlistStats(
+        total_signups=total_signups,
+        active_signups=active_signups,
+        inactive_signups=inactive_signups,
+        recent_signups=recent_signups,
+        today_signups=today_signups,
+        average_daily_signups=round(average_daily_signups, 2),
+        top_sources=top_sources
+    )
+
+def collect_timeseries(db: Session, start: date, end: date, bucket: str) -> WaitlistTimeseries:
+    """Signups per day or ISO week (Monday start) between two days, inclusive"""
+    day_rows = db.query(
+        SignupDaily.day,
+        func.sum(SignupDaily.active).label('active'),
+        func.sum(SignupDaily.inactive).label('inactive'),
+    ).filter(
+        SignupDaily.day >= start,
+        SignupDaily.day <= end
+    ).group_by(SignupDaily.day).all()
+    
+    def bucket_start(day: date) -> date:
+        return day - timedelta(days=day.weekday()) if bucket == "week" else day
+    
+    # Zero-filled buckets so charts get a continuous axis
+    step = timedelta(days=7 if bucket == "week" else 1)
+    buckets = {}
+    current = bucket_start(start)
+    while current <= end:
+        buckets[current] = [0, 0]
+        current += step
+    
+    for row in day_rows:
+        counts = buckets[bucket_start(row.day)]
+        counts[0] += row.active
+        counts[1] += row.inactive
+    
+    return WaitlistTimeseries(
+        bucket=bucket,
+        start=start,
+        end=end,
+        points=[
+            TimeseriesPoint(bucket_start=day, signups=active + inactive, active=active, inactive=inactive)
+            for day, (active, inactive) in buckets.items()
+        ]
+    )
+
+def list_entries(db: Session, skip: int, limit: int, active_only: bool, after=None) -> List[WaitlistEntryResponse]:
+    """Load one page of entries in waitlist order, optionally after a (created_at, id) key"""
+    query = db.query(WaitlistEntry)
+    
+    if active_only:
+        query = query.filter(WaitlistEntry.is_active == True)
+    
+    if after is not None:
+        query = query.filter(key_after(WaitlistEntry.created_at, WaitlistEntry.id, *after))
+    
+    entries = query.order_by(
+        WaitlistEntry.created_at.asc(), WaitlistEntry.id.asc()
+    ).offset(skip).limit(limit).all()
+    
+    return with_live_positions(db, entries)
+
+def deactivate_entry(db: Session, email: str):
+    """Soft-delete an active entry, raising 404 when there is none"""
+    entry = db.query(WaitlistEntry).filter(
+        WaitlistEntry.email == email,
+        WaitlistEntry.is_active == True
+    ).first()
+    
+    if not entry:
+        raise HTTPException(status_code=404, detail="Email not found in active waitlist")
+    
+    # Soft delete - mark as inactive, keeping the position held at departure
+    entry.position = compute_position(db, entry)
+    entry.is_active = False
+    entry.updated_at = datetime.utcnow()
+    track_activation(db, entry, active_delta=-1)
+    bump_counters(db, {
+        COUNTER_ACTIVE: -1, COUNTER_VERSION: 1, COUNTER_REORDERS: 1, SOURCE_COUNTER_PREFIX + entry.source: -1
+    })
+    bump_signups_daily(db, {(entry.created_at.date(), entry.source): (-1, 1)})
+    db.commit()
+
+EXPORT_CSV_HEADER = ["Email", "Source", "Created At", "Position", "Is Active"]
+
+def export_record(row, position: Optional[int]) -> dict:
+    """Shape one exported entry"""
+    return {
+        "email": row.email,
+        "source": row.source,
+        "created_at": row.created_at.isoformat(),
+        "position": position,
+        "is_active": row.is_active
+    }
+
+def load_export_rows(db: Session, active_only: bool) -> List[dict]:
+    """Load every exported entry as a plain row dict"""
+    query = db.query(WaitlistEntry)
+    
+    if active_only:
+        query = query.filter(WaitlistEntry.is_active == True)
+    
+    entries = query.order_by(WaitlistEntry.created_at.asc(), WaitlistEntry.id.asc()).all()
+    positions = export_positions(entries)
+    
+    return [export_record(entry, position) for entry, position in zip(entries, positions)]
+
+def open_export_cursor(db: Session, active_only: bool):
+    """Start a server-side cursor over the exported columns in waitlist order"""
+    stmt = select(
+        WaitlistEntry.email,
+        WaitlistEntry.source,
+        WaitlistEntry.created_at,
+        WaitlistEntry.position,
+        WaitlistEntry.is_active
+    ).order_by(WaitlistEntry.created_at.asc(), WaitlistEntry.id.asc())
+    
+    if active_only:
+        stmt = stmt.where(WaitlistEntry.is_active == True)
+    
+    return db.execute(stmt.execution_options(stream_results=True, yield_per=EXPORT_BATCH_SIZE))
+
+def next_export_chunk(db: Session, result, format: str, state: dict) -> Optional[str]:
+    """Fetch and encode the next batch from an export cursor; None once exhausted.
+
+    state carries the running position between batches.
+    """
+    rows = result.fetchmany(EXPORT_BATCH_SIZE)
+    if not rows:
+        return None
+    
+    records = []
+    for row in rows:
+        if row.is_active:
+            position = state["next_position"]
+            state["next_position"] += 1
+        else:
+            position = row.position
+        records.append(export_record(row, position))
+    
+    if format == "ndjson":
+        return "".join(json.dumps(record) + "\n" for record in records)
+    
+    output = StringIO()
+    writer = csv.writer(output)
+    for record in records:
+        writer.writerow([
+            record["email"],
+            record["source"],
+            record["created_at"],
+            record["position"],
+            record["is_active"]
+        ])
+    return output.getvalue()
+
+async def stream_export(db: AsyncDB, result, format: str, compress: bool):
+    """Yield an export chunk by chunk, closing the session when done or aborted"""
+    encoder = zlib.compressobj(wbits=31) if compress else None
+    state = {"next_position": 1}
+    started = time.perf_counter()
+    
+    def encode(text: str) -> bytes:
+        data = text.encode("utf-8")
+        return encoder.compress(data) if encoder else data
+    
+    try:
+        if format == "csv":
+            output = StringIO()
+            csv.writer(output).writerow(EXPORT_CSV_HEADER)
+            yield encode(output.getvalue())
+        
+        while True:
+            chunk = await db.run_sync(next_export_chunk, result, format, state)
+            if chunk is None:
+                break
+            data = encode(chunk)
+            if data:
+                yield data
+        
+        if encoder:
+            yield encoder.flush()
+    finally:
+        await db.run_sync(lambda session: result.close())
+        await db.close()
+        metrics.observe_operation(f"export_stream_{format}", time.perf_counter() - started)
+
+# reactivated_at only exists from migration 9 on, so an entry reactivated before that is
+# reported as an insert until it changes again
+def change_record(row) -> dict:
+    """Shape one change feed line; cursor resumes the feed right after it"""
+    if not row.is_active:
+        change = "unsubscribe"
+    elif row.reactivated_at is None:
+        change = "insert"
+    else:
+        change = "reactivation"
+    return {
+        "change": change,
+        "email": row.email,
+        "source": row.source,
+        "is_active": row.is_active,
+        "created_at": row.created_at.isoformat(),
+        "updated_at": row.updated_at.isoformat(),
+        "cursor": encode_cursor(row.updated_at, row.id)
+    }
+
+def open_changes_cursor(db: Session, after, until: datetime, limit: Optional[int] = None):
+    """Start a server-side cursor over entries changed after an (updated_at, id) key, up to until"""
+    stmt = select(
+        WaitlistEntry.id,
+        WaitlistEntry.email,
+        WaitlistEntry.source,
+        WaitlistEntry.created_at,
+        WaitlistEntry.updated_at,
+        WaitlistEntry.reactivated_at,
+        WaitlistEntry.is_active
+    ).where(WaitlistEntry.updated_at <= until).order_by(WaitlistEntry.updated_at.asc(), WaitlistEntry.id.asc())
+    
+    if after is not None:
+        stmt = stmt.where(key_after(WaitlistEntry.updated_at, WaitlistEntry.id, *after))
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    
+    return db.execute(stmt.execution_options(stream_results=True, yield_per=EXPORT_BATCH_SIZE))
+
+def next_changes_chunk(db: Session, result) -> Optional[str]:
+    """Fetch and encode the next batch of a change feed cursor as NDJSON; None once exhausted"""
+    rows = result.fetchmany(EXPORT_BATCH_SIZE)
+    if not rows:
+        return None
+    return "".join(json.dumps(change_record(row)) + "\n" for row in rows)
+
+async def stream_changes(db: AsyncDB, result):
+    """Yield the change feed chunk by chunk, closing the session when done or aborted"""
+    started = time.perf_counter()
+    try:
+        while True:
+            chunk = await db.run_sync(next_changes_chunk, result)
+            if chunk is None:
+                break
+            yield chunk
+    finally:
+        await db.run_sync(lambda session: result.close())
+        await db.close()
+        metrics.observe_operation("changes_stream", time.perf_counter() - started)
+
+def lookup_position(db: Session, email: str) -> dict:
+    """Resolve an active entry's live position, raising 404 when there is none"""
+    entry = db.query(WaitlistEntry).filter(
+        WaitlistEntry.email == email,
+        WaitlistEntry.is_active == True
+    ).first()
+    
+    if not entry:
+        raise HTTPException(status_code=404, detail="Email not found in waitlist")
+    
+    return position_record(entry, compute_position(db, entry), count_active(db))
+
+def position_record(entry, position: int, total_active: int) -> dict:
+    """Body of a found position lookup, shared by the single and batch endpoints"""
+    return {
+        "success": True,
+        "email": entry.email,
+        "position": position,
+        "total_signups": total_active,
+        "joined_at": entry.created_at.isoformat(),
+        "source": entry.source
+    }
+
+def begin_snapshot(db: Session):
+    """Pin the session's following reads to one consistent view of the database"""
+    if db.get_bind().dialect.name == "sqlite":
+        # pysqlite only opens transactions for writes; an explicit BEGIN holds one WAL read snapshot
+        connection = db.connection()
+        if not connection.connection.driver_connection.in_transaction:
+            connection.exec_driver_sql("BEGIN")
+    else:
+        db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+
+def open_position_snapshot(db: Session) -> dict:
+    """Start a snapshot read and load the block index every position in it is derived from"""
+    begin_snapshot(db)
+    counters = read_counters(db)
+    blocks = db.query(
+        PositionBlock.start_created_at, PositionBlock.start_entry_id, PositionBlock.active_count
+    ).order_by(PositionBlock.start_created_at.asc(), PositionBlock.start_entry_id.asc()).all()
+    
+    block_starts = []
+    active_before = []
+    running = 0
+    for start_created_at, start_entry_id, active_count in blocks:
+        block_starts.append((start_created_at, start_entry_id))
+        active_before.append(running)
+        running += active_count
+    
+    return {
+        "total_active": counters.get(COUNTER_ACTIVE, 0),
+        "block_starts": block_starts,
+        "active_before": active_before
+    }
+
+def snapshot_positions(db: Session, snapshot: dict, entries: list) -> dict:
+    """Positions for active entries, with one ordered id scan per block they fall in"""
+    block_starts = snapshot["block_starts"]
+    by_block = {}
+    for entry in entries:
+        block = bisect_right(block_starts, (entry.created_at, entry.id)) - 1
+        by_block.setdefault(block, []).append(entry)
+    
+    positions = {}
+    for block, members in by_block.items():
+        if block < 0:
+            # Sorts before every block: only possible while the block index is being rebuilt
+            for entry in members:
+                positions[entry.email] = compute_position(db, entry)
+            continue
+        
+        # Active ids from the block start through its last requested member, in waitlist
+        # order: a member's index in that list is the number of active entries ahead of it
+        last = max(members, key=lambda entry: (entry.created_at, entry.id))
+        ids = db.connection().execute(select(WaitlistEntry.id).where(
+            WaitlistEntry.is_active == True,
+            key_after(WaitlistEntry.created_at, WaitlistEntry.id, *block_starts[block], inclusive=True),
+            key_before(WaitlistEntry.created_at, WaitlistEntry.id, last.created_at, last.id, inclusive=True)
+        ).order_by(WaitlistEntry.created_at.asc(), WaitlistEntry.id.asc())).scalars().all()
+        ahead = {entry_id: index for index, entry_id in enumerate(ids)}
+        
+        for entry in members:
+            positions[entry.email] = snapshot["active_before"][block] + ahead[entry.id] + 1
+    
+    return positions
+
+def open_positions_lookup(db: Session, raw_emails: List[str]) -> dict:
+    """Start a snapshot read for a batch position lookup and queue its emails in request order.
+
+    Emails are normalized like signups (without EmailStr's stricter syntax check, which
+    no stored address can fail); repeats after normalization are answered once.
+    """
+    requested = []
+    seen = set()
+    for raw_email in raw_emails:
+        try:
+            email = normalize_email(raw_email)
+        except ValueError as e:
+            requested.append((raw_email, str(e)))
+            continue
+        if email not in seen:
+            seen.add(email)
+            requested.append((email, None))
+    
+    return {"snapshot": open_position_snapshot(db), "requested": requested, "next": 0}
+
+def next_positions_chunk(db: Session, lookup: dict) -> Optional[str]:
+    """Resolve and encode the next POSITION_LOOKUP_CHUNK_SIZE emails of a lookup; None once done.
+
+    Entries load with one IN (...) query per chunk and positions come from snapshot_positions,
+    so each block is scanned at most once per chunk however many of its emails are in it.
+    """
+    requested = lookup["requested"][lookup["next"]:lookup["next"] + POSITION_LOOKUP_CHUNK_SIZE]
+    if not requested:
+        return None
+    lookup["next"] += len(requested)
+    
+    snapshot = lookup["snapshot"]
+    emails = [email for email, error in requested if error is None]
+    found = {entry.email: entry for entry in db.query(
+        WaitlistEntry.email, WaitlistEntry.created_at, WaitlistEntry.id, WaitlistEntry.source
+    ).filter(
+        WaitlistEntry.email.in_(emails),
+        WaitlistEntry.is_active == True
+    )} if emails else {}
+    positions = snapshot_positions(db, snapshot, list(found.values()))
+    
+    records = []
+    for email, error in requested:
+        entry = found.get(email)
+        if error is not None:
+            records.append({"success": False, "email": email, "detail": error})
+        elif entry is None:
+            records.append({"success": False, "email": email, "detail": "Email not found in waitlist"})
+        else:
+            records.append(position_record(entry, positions[email], snapshot["total_active"]))
+    return "".join(json.dumps(record) + "\n" for record in records)
+
+async def stream_positions(db: AsyncDB, lookup: dict):
+    """Yield a batch position lookup chunk by chunk, closing the session when done or aborted"""
+    started = time.perf_counter()
+    try:
+        while True:
+            chunk = await db.run_sync(next_positions_chunk, lookup)
+            if chunk is None:
+                break
+            yield chunk
+    finally:
+        await db.close()
+        metrics.observe_operation("positions_stream", time.perf_counter() - started)
+
+def read_feed_counts(db: Session) -> dict:
+    """Totals for the live feed from the counters table"""
+    counters = read_counters(db)
+    return {
+        "total": counters.get(COUNTER_TOTAL, 0),
+        "active": counters.get(COUNTER_ACTIVE, 0),
+        "reorders": counters.get(COUNTER_REORDERS, 0),
+        "sources": active_source_counts(counters)
+    }
+
+def lookup_positions(db: Session, emails: List[str]) -> dict:
+    """Live positions for several emails; None for addresses not actively waiting"""
+    entries = db.query(WaitlistEntry).filter(
+        WaitlistEntry.email.in_(emails),
+        WaitlistEntry.is_active == True
+    ).all()
+    positions = {email: None for email in emails}
+    for entry in entries:
+        positions[entry.email] = compute_position(db, entry)
+    return positions
+
+def load_active_email_hashes(db: Session):
+    """Version and sorted email hashes of every active entry, streamed from the table"""
+    version = read_version(db)
+    result = db.execute(
+        select(WaitlistEntry.email).where(WaitlistEntry.is_active == True).execution_options(
+            stream_results=True, yield_per=EXPORT_BATCH_SIZE
+        )
+    )
+    try:
+        return version, build_hashes(email for (email,) in result)
+    finally:
+        result.close()
+
+# Email index
+email_index = EmailIndex()
+email_index_task: Optional[asyncio.Task] = None
+email_index_built_at = None
+
+async def rebuild_email_index():
+    """(Re)build the active-email index off the event loop; writes meanwhile are replayed"""
+    global email_index_built_at
+    if email_index.building:
+        return
+    email_index_built_at = time.monotonic()
+    email_index.begin_build()
+    try:
+        started = time.perf_counter()
+        version, hashes = await run_detached(load_active_email_hashes)
+        metrics.observe_operation("email_index_build", time.perf_counter() - started)
+    except Exception as e:
+        email_index.finish_build(None, None)
+        print(f"⚠️  Email index build failed: {e}")
+        return
+    email_index.finish_build(version, hashes)
+
+def schedule_email_index_rebuild(force: bool = False):
+    global email_index_task
+    if not EMAIL_INDEX_ENABLED or email_index.building:
+        return
+    if not force and email_index_built_at is not None and \
+            time.monotonic() - email_index_built_at < EMAIL_INDEX_REBUILD_SECONDS:
+        return
+    email_index_task = asyncio.create_task(rebuild_email_index())
+
+def record_active_emails(emails: List[str], active: bool, bumps: int = 1):
+    """Mirror a committed local write into the email index"""
+    if EMAIL_INDEX_ENABLED and email_index.ready:
+        email_index.record(emails, active, bumps)
+        if email_index.needs_compaction:
+            schedule_email_index_rebuild(force=True)
+
+async def definitely_not_active(email: str) -> bool:
+    """True only when the index proves the email has no active entry"""
+    if not EMAIL_INDEX_ENABLED or email_index.might_be_active(email):
+        return False
+    version = await current_version()
+    # Checked again: a rebuild may have been swapped in while the version was read
+    if email_index.is_fresh(version):
+        return not email_index.might_be_active(email)
+    if email_index.ready and version != email_index.version + email_index.local_bumps:
+        # Another process wrote (ahead), or a local write committed before a rebuild's snapshot
+        # but was recorded after begin_build and replayed on top of it (behind): rebuild either way
+        schedule_email_index_rebuild()
+    return False
+
+PENDING_IDEMPOTENCY_RESPONSE = json.dumps(None)
+
+def claim_idempotency_key(db: Session, key: str, fingerprint: str, not_before: datetime, stale_before: datetime):
+    """Claim key with a pending record, or return the (fingerprint, response) it holds.
+
+    None means this call owns the key; a None response means another request does.
+    Expired records and pending claims older than stale_before are taken over.
+    """
+    while True:
+        stmt = dialect_insert(db, IdempotencyRecord).values(
+            key=key, fingerprint=fingerprint, response=PENDING_IDEMPOTENCY_RESPONSE, created_at=datetime.utcnow()
+        )
+        # The conflicting row is locked until this commits, so exactly one duplicate claims it
+        claimed = db.execute(stmt.on_conflict_do_update(
+            index_elements=[IdempotencyRecord.key],
+            set_={
+                "fingerprint": stmt.excluded.fingerprint,
+                "response": stmt.excluded.response,
+                "created_at": stmt.excluded.created_at
+            },
+            where=or_(
+                IdempotencyRecord.created_at < not_before,
+                and_(
+                    IdempotencyRecord.response == PENDING_IDEMPOTENCY_RESPONSE,
+                    IdempotencyRecord.created_at < stale_before
+                )
+            )
+        ).returning(IdempotencyRecord.key)).first()
+        record = None if claimed else db.query(
+            IdempotencyRecord.fingerprint, IdempotencyRecord.response
+        ).filter(IdempotencyRecord.key == key).first()
+        db.commit()
+        if claimed:
+            return None
+        # Otherwise the claim was released between the two statements
+        if record is not None:
+            return record.fingerprint, json.loads(record.response)
+
+def release_idempotency_key(db: Session, key: str, fingerprint: str):
+    """Drop a pending claim whose request failed, so a retry runs again"""
+    db.query(IdempotencyRecord).filter(
+        IdempotencyRecord.key == key,
+        IdempotencyRecord.fingerprint == fingerprint,
+        IdempotencyRecord.response == PENDING_IDEMPOTENCY_RESPONSE
+    ).delete(synchronize_session=False)
+    db.commit()
+
+def save_idempotency_record(db: Session, key: str, fingerprint: str, response: dict,
+                            purge_before: Optional[datetime] = None):
+    """Store a response over its key's pending claim and optionally purge expired records"""
+    if purge_before is not None:
+        db.query(IdempotencyRecord).filter(
+            IdempotencyRecord.created_at < purge_before
+        ).delete(synchronize_session=False)
+    
+    values = {"fingerprint": fingerprint, "response": json.dumps(response), "created_at": datetime.utcnow()}
+    stmt = dialect_insert(db, IdempotencyRecord).values(key=key, **values)
+    db.execute(stmt.on_conflict_do_update(index_elements=[IdempotencyRecord.key], set_=values))
+    db.commit()
+
+# Idempotency
+if IDEMPOTENCY_STORE == "database":
+    idempotency_store = DatabaseIdempotencyStore(
+        claim=lambda key, fingerprint, not_before, stale_before: run_detached(
+            claim_idempotency_key, key, fingerprint, not_before, stale_before
+        ),
+        save=lambda key, fingerprint, response, purge_before: run_detached(
+            save_idempotency_record, key, fingerprint, response, purge_before
+        ),
+        release=lambda key, fingerprint: run_detached(release_idempotency_key, key, fingerprint),
+        ttl=IDEMPOTENCY_TTL_SECONDS,
+        max_keys=IDEMPOTENCY_MAX_KEYS,
+        claim_timeout=IDEMPOTENCY_CLAIM_SECONDS
+    )
+else:
+    idempotency_store = MemoryIdempotencyStore(ttl=IDEMPOTENCY_TTL_SECONDS, max_keys=IDEMPOTENCY_MAX_KEYS)
+idempotency = IdempotencyManager(idempotency_store, wait_timeout=IDEMPOTENCY_WAIT_SECONDS)
+
+# Live feed
+live_feed = LiveFeed(
+    get_version=current_version,
+    load_counts=lambda: run_detached(read_feed_counts),
+    load_positions=lambda emails: run_detached(lookup_positions, list(emails)),
+    interval_ms=SSE_UPDATE_INTERVAL_MS,
+    heartbeat_seconds=SSE_HEARTBEAT_SECONDS,
+    queue_size=SSE_QUEUE_SIZE,
+    max_subscribers=SSE_MAX_SUBSCRIBERS
+)
+
+# Read replica
+read_router = None
+if read_engine is not None:
+    read_router = ReadRouter(
+        read_version=lambda: run_detached(read_version, replica=True),
+        check_interval=READ_REPLICA_CHECK_SECONDS,
+        max_lag=READ_REPLICA_MAX_LAG,
+        sticky_seconds=READ_REPLICA_STICKY_SECONDS,
+        on_route=metrics.record_read_route if METRICS_ENABLED else None
+    )
+
+# Worker lifecycle
+def warm_engine(target_engine, connections: int):
+    """Open pooled connections up front so the first requests don't pay for connecting"""
+    opened = []
+    try:
+        for _ in range(connections):
+            connection = target_engine.connect()
+            opened.append(connection)
+            connection.exec_driver_sql("SELECT 1")
+    finally:
+        for connection in opened:
+            connection.close()
+
+async def warm_async_engine(target_engine, connections: int):
+    opened = []
+    try:
+        for _ in range(connections):
+            connection = await target_engine.connect()
+            opened.append(connection)
+            await connection.exec_driver_sql("SELECT 1")
+    finally:
+        for connection in opened:
+            await connection.close()
+
+async def warm_database_pools():
+    if DB_POOL_WARM_CONNECTIONS <= 0:
+        return
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(db_executor, warm_engine, engine, DB_POOL_WARM_CONNECTIONS)
+    if async_engine is not None:
+        await warm_async_engine(async_engine, DB_POOL_WARM_CONNECTIONS)
+    if read_engine is not None:
+        try:
+            if read_async_engine is not None:
+                await warm_async_engine(read_async_engine, DB_POOL_WARM_CONNECTIONS)
+            else:
+                await loop.run_in_executor(db_executor, warm_engine, read_engine, DB_POOL_WARM_CONNECTIONS)
+        except DBAPIError as e:
+            # Reads fall back to the primary until the replica answers
+            print(f"⚠️  Read replica unavailable at startup: {e}")
+
+def end_streams_on_exit():
+    """Close SSE streams as soon as the server is told to stop.
+
+    The server waits for open responses before running the lifespan shutdown, so
+    long-lived streams would otherwise hold up the drain of in-flight signups.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        return
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        previous = signal.getsignal(signum)
+        if not callable(previous):
+            continue
+        
+        def handler(signum, frame, previous=previous):
+            loop.call_soon_threadsafe(asyncio.ensure_future, live_feed.stop())
+            previous(signum, frame)
+        
+        signal.signal(signum, handler)
+
+def report_worker_ready():
+    """Log how long this worker took to start and how much memory it holds"""
+    startup = process_age_seconds()
+    rss = resident_memory_bytes()
+    if startup is not None:
+        metrics.worker_startup.set(startup)
+    details = []
+    if startup is not None:
+        details.append(f"ready in {startup * 1000:.0f} ms")
+    if rss is not None:
+        details.append(f"{rss / (1024 * 1024):.1f} MB resident")
+    print(f"✅ Worker {os.getpid()} {', '.join(details) or 'ready'}")
+
+# Group commit
+signup_queue: Optional[GroupCommitQueue] = None
+
+async def flush_signup_batch(items: list) -> list:
+    """Write one batch of queued signups through a dedicated session"""
+    results = await run_detached(register_signup_batch, items)
+    for result in results:
+        if isinstance(result, WaitlistResponse) and result.success:
+            record_active_emails([result.email], True)
+    await invalidate_cached_reads()
+    return results
+
+# Bulk import
+class BulkImporter:
+    """Validate, dedupe and batch-insert signups streamed as CSV or NDJSON lines.
+
+    Feed lines with feed_line(); whenever batch_full is set, call flush(db) (also
+    once at the end). Emails already on the waitlist, active or not, are skipped;
+    archived ones are restored to their original place, as a signup would.
+    """
+    
+    def __init__(self, format: str, default_source: str = "website", batch_size: int = BULK_BATCH_SIZE):
+        self.format = format
+        self.default_source = default_source
+        self.batch_size = batch_size
+        self.header = None
+        self.seen = set()
+        self.pending = []
+        self.rows = 0
+        self.inserted = 0
+        self.restored = 0
+        self.duplicates = 0
+        self.existing = 0
+        self.error_count = 0
+        self.errors = []
+    
+    @property
+    def batch_full(self) -> bool:
+        return len(self.pending) >= self.batch_size
+    
+    def add_error(self, row: int, email, error: str):
+        self.error_count += 1
+        if len(self.errors) < BULK_MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row, "email": email, "error": error})
+    
+    def parse_line(self, line: str) -> Optional[dict]:
+        """Turn one line into a record; the first CSV line is the header"""
+        if self.format == "ndjson":
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError("Expected a JSON object")
+            return record
+        
+        try:
+            values = next(csv.reader([line]))
+        except csv.Error as e:
+            raise ValueError(f"Malformed CSV: {e}") from e
+        if self.header is None:
+            self.header = [value.strip().lower() for value in values]
+            if "email" not in self.header:
+                raise ValueError("CSV header must include an 'email' column")
+            return None
+        return dict(zip(self.header, values))
+    
+    def feed_line(self, line: str):
+        """Validate one input line and queue it for insertion"""
+        line = line.strip()
+        if not line:
+            return
+        
+        if self.header is None and self.format == "csv":
+            # Header problems abort the import rather than being reported per row
+            self.parse_line(line)
+            return
+        
+        self.rows += 1
+        try:
+            record = self.parse_line(line)
+        except ValueError as e:
+            self.add_error(self.rows, None, f"Unparseable row: {e}")
+            return
+        
+        email = record.get("email")
+        try:
+            signup = WaitlistSignupRequest(
+                email=email,
+                source=record.get("source") or self.default_source
+            )
+        except ValidationError as e:
+            self.add_error(self.rows, email, "; ".join(error["msg"] for error in e.errors()))
+            return
+        
+        if signup.email in self.seen:
+            self.duplicates += 1
+            return
+        self.seen.add(signup.email)
+        self.pending.append(signup)
+    
+    def flush(self, db: Session) -> List[str]:
+        """Insert the queued batch with one executemany, account for it in bulk and return the inserted emails"""
+        batch, self.pending = self.pending, []
+        if not batch:
+            return []
+        
+        now = datetime.utcnow()
+        archived = {
+            email for (email,) in db.query(ArchivedEntry.email).filter(
+                ArchivedEntry.email.in_([signup.email for signup in batch])
+            )
+        }
+        inserted = []
+        appended = [signup for signup in batch if signup.email not in archived]
+        if appended:
+            stmt = dialect_insert(db, WaitlistEntry).on_conflict_do_nothing(
+                index_elements=[WaitlistEntry.email]
+            ).returning(WaitlistEntry.id, WaitlistEntry.created_at, WaitlistEntry.source, WaitlistEntry.email)
+            inserted = db.execute(stmt, [self.entry_values(signup, now) for signup in appended]).all()
+        
+        inserted.sort(key=lambda row: (row.created_at, row.id))
+        track_new_entries(db, inserted)
+        
+        counter_deltas = {COUNTER_TOTAL: len(inserted), COUNTER_ACTIVE: len(inserted)}
+        rollup_deltas = {}
+        for row in inserted:
+            source_counter = SOURCE_COUNTER_PREFIX + row.source
+            counter_deltas[source_counter] = counter_deltas.get(source_counter, 0) + 1
+            key = (row.created_at.date(), row.source)
+            rollup_deltas[key] = (rollup_deltas.get(key, (0, 0))[0] + 1, 0)
+        
+        # Restored after the batch is tracked, so their blocks are recounted from tracked rows only
+        restored = []
+        for signup in batch:
+            if signup.email in archived:
+                row = self.restore(db, signup, now)
+                if row is not None:
+                    restored.append(signup.email)
+                    source_counter = SOURCE_COUNTER_PREFIX + signup.source
+                    counter_deltas[source_counter] = counter_deltas.get(source_counter, 0) + 1
+                    day = row.created_at.date()
+                    for key, (active, inactive) in (((day, row.source), (0, -1)), ((day, signup.source), (1, 0))):
+                        old_active, old_inactive = rollup_deltas.get(key, (0, 0))
+                        rollup_deltas[key] = (old_active + active, old_inactive + inactive)
+        
+        # Restored entries are already in the total from their time in the archive
+        counter_deltas[COUNTER_ACTIVE] += len(restored)
+        counter_deltas[COUNTER_REORDERS] = len(restored)
+        counter_deltas[COUNTER_VERSION] = 1 if inserted or restored else 0
+        bump_counters(db, counter_deltas)
+        bump_signups_daily(db, rollup_deltas)
+        db.commit()
+        
+        self.inserted += len(inserted)
+        self.restored += len(restored)
+        self.existing += len(batch) - len(inserted) - len(restored)
+        return [row.email for row in inserted] + restored
+    
+    @staticmethod
+    def entry_values(signup: WaitlistSignupRequest, now: datetime) -> dict:
+        return {
+            "email": signup.email,
+            "source": signup.source,
+            "created_at": now,
+            "updated_at": now,
+            "is_active": True
+        }
+    
+    def restore(self, db: Session, signup: WaitlistSignupRequest, now: datetime):
+        """Bring an archived email back at its original place; None when it is already on the waitlist"""
+        entry_id = db.execute(
+            dialect_insert(db, WaitlistEntry).values(self.entry_values(signup, now)).on_conflict_do_nothing(
+                index_elements=[WaitlistEntry.email]
+            ).returning(WaitlistEntry.id)
+        ).scalar()
+        if entry_id is None:
+            return None
+        row = restore_archived_entry(db, entry_id, signup.email)
+        if row.source != signup.source:
+            db.query(WaitlistEntry).filter(WaitlistEntry.id == row.id).update(
+                {WaitlistEntry.source: signup.source}, synchronize_session=False
+            )
+        return row
+    
+    def report(self) -> dict:
+        return {
+            "rows": self.rows,
+            "inserted": self.inserted,
+            "restored_from_archive": self.restored,
+            "duplicates_in_input": self.duplicates,
+            "already_on_waitlist": self.existing,
+            "error_count": self.error_count,
+            "errors": self.errors
+        }
+
+def run_bulk_import(db: Session, lines: Iterable[str], importer: BulkImporter) -> dict:
+    """Drive a BulkImporter over an iterable of lines (used by the CLI)"""
+    for line in lines:
+        importer.feed_line(line)
+        if importer.batch_full:
+            importer.flush(db)
+    importer.flush(db)
+    return importer.report()
+
+async def iter_request_lines(request: Request) -> AsyncIterator[str]:
+    """Decode a streamed request body into lines without buffering all of it"""
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8-sig")
+    if buffer:
+        yield buffer.decode("utf-8-sig")
+
 # API Endpoints
 
 @app.get("/", response_model=dict)
@@ -149,12 +2262,84 @@ async def root():
         "health_check": "/health"
     }
 
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics_endpoint():
+    """Prometheus text exposition of this worker's metrics"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Guard for admin endpoints; they stay disabled until ADMIN_TOKEN is set"""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled (set ADMIN_TOKEN)")
+    if x_admin_token is None or not hmac.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+@app.get("/admin/cache", dependencies=[Depends(require_admin)])
+async def cache_stats():
+    """Response cache hit/miss counts for this worker"""
+    return response_cache.stats()
+
+@app.get("/admin/db-pool", dependencies=[Depends(require_admin)])
+async def db_pool_stats():
+    """Connection pool usage per engine"""
+    pools = {"primary": pool_stats(engine)}
+    if async_engine is not None:
+        pools["primary_async"] = pool_stats(async_engine.sync_engine)
+    if read_engine is not None:
+        pools["replica"] = pool_stats(read_engine)
+    return pools
+
+@app.get("/admin/read-replica", dependencies=[Depends(require_admin)])
+async def read_replica_stats():
+    """Replica health, version and how reads were routed in this worker"""
+    if read_router is None:
+        return {"enabled": False}
+    return {"enabled": True, **read_router.stats()}
+
+@app.get("/admin/email-index", dependencies=[Depends(require_admin)])
+async def email_index_stats():
+    """Size and freshness of this worker's active-email index"""
+    return {"enabled": EMAIL_INDEX_ENABLED, **email_index.stats()}
+
+@app.get("/admin/profiles", dependencies=[Depends(require_admin)])
+async def list_profiles():
+    """List stored request profiles, newest first"""
+    if profiler is None:
+        return {"enabled": False, "profiles": []}
+    return {"enabled": True, "profiles": profiler.store.list()}
+
+@app.get("/admin/profiles/{profile_id}", dependencies=[Depends(require_admin)])
+async def download_profile(
+    profile_id: str,
+    format: str = Query("json", pattern="^(json|folded)$", description="json or folded (flame graph input)")
+):
+    """Download one stored request profile"""
+    profile = None
+    if profiler is not None:
+        profile = await asyncio.get_running_loop().run_in_executor(None, profiler.store.load, profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    
+    if format == "folded":
+        return PlainTextResponse(
+            folded_output(profile),
+            headers={"Content-Disposition": f'attachment; filename="{profile_id}.folded"'}
+        )
+    return Response(
+        content=json.dumps(profile),
+        media_type="application/json",
+        headers={"Content-Disposition": f'attachment; filename="{profile_id}.json"'}
+    )
+
 @app.get("/health", response_model=HealthResponse)
-async def health_check(db: Session = Depends(get_db)):
+async def health_check():
     """Comprehensive health check endpoint"""
     try:
-        # Test database connection
-        total_entries = db.query(WaitlistEntry).count()
+        # Test database connection (a successful check is cached for CACHE_TTL_HEALTH)
+        version = await current_version()
+        total_entries = await response_cache.get_or_compute(
+            "health", str(version), CACHE_TTL_HEALTH, lambda: run_read(count_all_entries, version=version)
+        )
         db_status = "healthy"
     except Exception as e:
         db_status = f"error: {str(e)}"
@@ -168,146 +2353,213 @@ async def health_check(db: Session = Depends(get_db)):
         version="2.0.0"
     )
 
+async def process_signup(
+    signup_data: WaitlistSignupRequest,
+    client_info: dict,
+    db: AsyncDB,
+    sticky_token: Optional[str] = None
+) -> WaitlistResponse:
+    """Rate-limit, then register one signup"""
+    # Throttled before any database work
+    if signup_limiter is not None:
+        ip_address = client_info["ip_address"]
+        try:
+            await signup_limiter.check([
+                ("ip", ip_address),
+                ("subnet", subnet_key(ip_address) if ip_address else None),
+                ("email", signup_data.email),
+            ])
+        except RateLimited as e:
+            metrics.record_rate_limited(e.rule)
+            raise HTTPException(
+                status_code=429,
+                detail=f"Too many signup attempts, please retry in {e.retry_after_header} seconds",
+                headers={"Retry-After": e.retry_after_header}
+            )
+    
+    try:
+        # Repeats of an active email are answered without a write transaction
+        if EMAIL_INDEX_ENABLED and email_index.might_be_active(signup_data.email):
+            repeat = await db.run_sync(lookup_repeat_signup, signup_data.email)
+            if repeat is not None:
+                return repeat
+        
+        if signup_queue is not None:
+            result = await signup_queue.submit((signup_data, client_info))
+        else:
+            result = await db.run_sync(register_signup, signup_data, client_info)
+            if result.success:
+                record_active_emails([signup_data.email], True)
+                await invalidate_cached_reads()
+        
+        if result.success:
+            live_feed.publish_signup(signup_data.email, signup_data.source, datetime.utcnow().isoformat())
+            if read_router is not None:
+                read_router.mark_write(sticky_token, signup_data.email)
+        return result
+        
+    except WriteQueueUnavailable as e:
+        raise HTTPException(status_code=503, detail=f"{e}, please retry shortly", headers={"Retry-After": "1"})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
 @app.post("/api/waitlist/signup", response_model=WaitlistResponse)
 async def signup_waitlist(
     signup_data: WaitlistSignupRequest,
     request: Request,
-    db: Session = Depends(get_db)
+    response: Response,
+    db: AsyncDB = Depends(get_db)
 ):
-    """Add email to waitlist with comprehensive validation"""
+    """Add email to waitlist with comprehensive validation.
+
+    With an Idempotency-Key header, retries of the same signup get the original
+    response back (marked Idempotent-Replayed) instead of running it again.
+    """
+    sticky_token = issue_sticky_token(request, response)
+    idempotency_key = request.headers.get("idempotency-key")
+    if idempotency_key is None:
+        return await process_signup(signup_data, get_client_info(request), db, sticky_token)
+    
+    if not idempotency_key or len(idempotency_key) > MAX_KEY_LENGTH:
+        raise HTTPException(status_code=400, detail=f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters")
+    
+    async def compute():
+        return jsonable_encoder(await process_signup(signup_data, get_client_info(request), db, sticky_token))
+    
     try:
-        # Check if email already exists
-        existing_entry = db.query(WaitlistEntry).filter(
-            WaitlistEntry.email == signup_data.email
-        ).first()
-        
-        if existing_entry:
-            if existing_entry.is_active:
-                return WaitlistResponse(
-                    success=False,
-                    message="You're already on our waitlist! We'll notify you when SiikHub launches.",
-                    email=signup_data.email,
-                    position=existing_entry.position,
-                    total_signups=db.query(WaitlistEntry).filter(WaitlistEntry.is_active == True).count()
-                )
-            else:
-                # Reactivate inactive entry
-                existing_entry.is_active = True
-                existing_entry.updated_at = datetime.utcnow()
-                existing_entry.source = signup_data.source
-                db.commit()
-                
-                update_positions(db)
-                db.refresh(existing_entry)
-                
-                total_active = db.query(WaitlistEntry).filter(WaitlistEntry.is_active == True).count()
-                
-                return WaitlistResponse(
-                    success=True,
-                    message=f"🎉 Welcome back! You're #{existing_entry.position} on the SiikHub waitlist.",
-                    email=signup_data.email,
-                    position=existing_entry.position,
-                    total_signups=total_active
-                )
-        
-        # Create new entry
-        client_info = get_client_info(request)
-        
-        new_entry = WaitlistEntry(
-            email=signup_data.email,
-            source=signup_data.source,
-            **client_info
+        result, replayed = await idempotency.run(
+            idempotency_key, request_fingerprint(signup_data.email, signup_data.source), compute
         )
+    except IdempotencyKeyReused as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except IdempotencyKeyInProgress as e:
+        raise HTTPException(status_code=409, detail=str(e), headers={"Retry-After": "1"})
+    
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    return result
+
+def record_imported_emails(emails: List[str]):
+    """Mirror a committed import batch into the email index and keep reads about it on the primary"""
+    record_active_emails(emails, True)
+    if read_router is not None:
+        read_router.mark_write(*emails)
+
+@app.post("/api/waitlist/bulk", dependencies=[Depends(require_admin)])
+async def bulk_import_waitlist(
+    request: Request,
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson)$"),
+    source: str = Query("website"),
+    db: AsyncDB = Depends(get_db)
+):
+    """Import a CSV (email[,source] header) or NDJSON body of signups (admin endpoint).
+
+    The body is consumed as a stream and inserted in batches; the response reports
+    counts and per-row validation errors.
+    """
+    if format is None:
+        content_type = request.headers.get("content-type", "")
+        format = "ndjson" if "json" in content_type else "csv"
+    
+    importer = BulkImporter(format, default_source=source)
+    try:
+        async for line in iter_request_lines(request):
+            importer.feed_line(line)
+            if importer.batch_full:
+                inserted = await db.run_sync(importer.flush)
+                if inserted:
+                    record_imported_emails(inserted)
+        inserted = await db.run_sync(importer.flush)
+        if inserted:
+            record_imported_emails(inserted)
         
-        db.add(new_entry)
-        db.commit()
-        
-        # Update positions
-        update_positions(db)
-        db.refresh(new_entry)
-        
-        total_active = db.query(WaitlistEntry).filter(WaitlistEntry.is_active == True).count()
-        
-        return WaitlistResponse(
-            success=True,
-            message=f"🎉 You're in! You're #{new_entry.position} on the SiikHub waitlist. We'll notify you when we launch!",
-            email=signup_data.email,
-            position=new_entry.position,
-            total_signups=total_active
-        )
+        report = importer.report()
+        report["success"] = True
+        report["total_signups"] = await db.run_sync(count_active)
+        return report
         
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Bulk import failed after {importer.inserted} inserts: {str(e)}")
+    finally:
+        if importer.inserted:
+            await invalidate_cached_reads()
 
 @app.get("/api/waitlist/stats", response_model=WaitlistStats)
-async def get_waitlist_stats(db: Session = Depends(get_db)):
-    """Get comprehensive waitlist statistics"""
+async def get_waitlist_stats(request: Request, response: Response):
+    """Get comprehensive waitlist statistics (cached for CACHE_TTL_STATS, dropped on writes)"""
+    async def compute():
+        return jsonable_encoder(await run_read(collect_stats, version=version, sticky=sticky_keys(request)))
+    
     try:
-        # Basic counts
-        total_signups = db.query(WaitlistEntry).count()
-        active_signups = db.query(WaitlistEntry).filter(WaitlistEntry.is_active == True).count()
-        inactive_signups = total_signups - active_signups
-        
-        # Recent signups (last 7 days)
-        week_ago = datetime.utcnow() - timedelta(days=7)
-        recent_signups = db.query(WaitlistEntry).filter(
-            WaitlistEntry.is_active == True,
-            WaitlistEntry.created_at >= week_ago
-        ).count()
-        
-        # Today's signups
-        today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-        today_signups = db.query(WaitlistEntry).filter(
-            WaitlistEntry.created_at >= today_start
-        ).count()
-        
-        # Average daily signups (last 30 days)
-        thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-        signups_last_30_days = db.query(WaitlistEntry).filter(
-            WaitlistEntry.created_at >= thirty_days_ago
-        ).count()
-        average_daily_signups = signups_last_30_days / 30.0
-        
-        # Top sources
-        source_stats = db.query(
-            WaitlistEntry.source,
-            func.count(WaitlistEntry.id).label('count')
-        ).filter(
-            WaitlistEntry.is_active == True
-        ).group_by(WaitlistEntry.source).order_by(
-            func.count(WaitlistEntry.id).desc()
-        ).limit(5).all()
-        
-        top_sources = [{"source": stat.source, "count": stat.count} for stat in source_stats]
-        
-        return WaitlistStats(
-            total_signups=total_signups,
-            active_signups=active_signups,
-            inactive_signups=inactive_signups,
-            recent_signups=recent_signups,
-            today_signups=today_signups,
-            average_daily_signups=round(average_daily_signups, 2),
-            top_sources=top_sources
-        )
+        # The day/week windows move at midnight even without writes
+        version = await current_version()
+        today = datetime.utcnow().date().isoformat()
+        etag = version_etag(version, today)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        response.headers["ETag"] = etag
+        
+        return await response_cache.get_or_compute("stats", f"{version}:{today}", CACHE_TTL_STATS, compute)
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch statistics: {str(e)}")
 
+@app.get("/api/waitlist/stats/timeseries", response_model=WaitlistTimeseries)
+async def get_waitlist_timeseries(
+    from_date: Optional[date] = Query(None, alias="from"),
+    to_date: Optional[date] = Query(None, alias="to"),
+    bucket: str = Query("day", pattern="^(day|week)$"),
+    db: AsyncDB = Depends(get_db)
+):
+    """Get signup counts per day or week for charts (defaults to the last 30 days)"""
+    end = to_date or datetime.utcnow().date()
+    start = from_date or end - timedelta(days=29)
+    
+    if start > end:
+        raise HTTPException(status_code=400, detail="'from' must not be after 'to'")
+    if (end - start).days > 3660:
+        raise HTTPException(status_code=400, detail="Date range cannot exceed 10 years")
+    
+    try:
+        return await db.run_sync(collect_timeseries, start, end, bucket)
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch timeseries: {str(e)}")
+
 @app.get("/api/waitlist/entries", response_model=List[WaitlistEntryResponse])
 async def get_waitlist_entries(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     active_only: bool = Query(True),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None)
 ):
-    """Get paginated waitlist entries (admin endpoint)"""
+    """Get paginated waitlist entries (admin endpoint).
+
+    Pass the X-Next-Cursor header of a page back as cursor to fetch the next one;
+    cursor pages cost the same at any depth and do not shift while people sign up.
+    """
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
     try:
-        query = db.query(WaitlistEntry)
+        version = await current_version()
+        etag = version_etag(version)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        response.headers["ETag"] = etag
         
-        if active_only:
-            query = query.filter(WaitlistEntry.is_active == True)
+        entries = await run_read(
+            list_entries, skip, limit, active_only, after, version=version, sticky=sticky_keys(request)
+        )
         
-        entries = query.order_by(WaitlistEntry.position.asc()).offset(skip).limit(limit).all()
+        if len(entries) == limit:
+            response.headers["X-Next-Cursor"] = encode_cursor(entries[-1].created_at, entries[-1].id)
         
         return entries
         
@@ -315,7 +2567,7 @@ async def get_waitlist_entries(
         raise HTTPException(status_code=500, detail=f"Failed to fetch entries: {str(e)}")
 
 @app.delete("/api/waitlist/unsubscribe/{email}")
-async def unsubscribe_email(email: str, db: Session = Depends(get_db)):
+async def unsubscribe_email(email: str, request: Request, response: Response, db: AsyncDB = Depends(get_db)):
     """Unsubscribe email from waitlist (GDPR compliance)"""
     try:
         # Validate email format
@@ -323,22 +2575,14 @@ async def unsubscribe_email(email: str, db: Session = Depends(get_db)):
         if not re.match(r'^[^\s@]+@[^\s@]+\.[^\s@]+$', email):
             raise HTTPException(status_code=400, detail="Invalid email format")
         
-        # Find entry
-        entry = db.query(WaitlistEntry).filter(
-            WaitlistEntry.email == email,
-            WaitlistEntry.is_active == True
-        ).first()
-        
-        if not entry:
+        if await definitely_not_active(email):
             raise HTTPException(status_code=404, detail="Email not found in active waitlist")
         
-        # Soft delete - mark as inactive
-        entry.is_active = False
-        entry.updated_at = datetime.utcnow()
-        db.commit()
-        
-        # Update positions for remaining entries
-        update_positions(db)
+        await db.run_sync(deactivate_entry, email)
+        record_active_emails([email], False)
+        await invalidate_cached_reads()
+        if read_router is not None:
+            read_router.mark_write(issue_sticky_token(request, response), email)
         
         return {
             "success": True,
@@ -353,30 +2597,56 @@ async def unsubscribe_email(email: str, db: Session = Depends(get_db)):
 
 @app.get("/api/waitlist/export")
 async def export_waitlist(
-    format: str = Query("json", regex="^(json|csv)$"),
+    request: Request,
+    response: Response,
+    format: str = Query("json", pattern="^(json|csv|ndjson)$"),
     active_only: bool = Query(True),
-    db: Session = Depends(get_db)
+    stream: bool = Query(False),
+    gzip: bool = Query(False)
 ):
-    """Export waitlist data (admin endpoint)"""
-    try:
-        query = db.query(WaitlistEntry)
+    """Export waitlist data (admin endpoint).
+
+    format=ndjson, or format=csv with stream=true, streams rows from a server-side
+    cursor with flat memory; gzip=true compresses the stream on the fly.
+    """
+    if format == "json" and stream:
+        raise HTTPException(status_code=400, detail="Streaming export supports csv and ndjson formats")
+    
+    version = await current_version()
+    etag = version_etag(version)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
+    if format == "ndjson" or stream:
+        # The stream outlives the request, so its session is closed by stream_export
+        try:
+            export_db, result = await open_read_cursor(
+                open_export_cursor, active_only, version=version, sticky=sticky_keys(request)
+            )
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Failed to export data: {str(e)}")
         
-        if active_only:
-            query = query.filter(WaitlistEntry.is_active == True)
+        extension = "csv" if format == "csv" else "ndjson"
+        headers = {
+            "Content-Disposition": f"attachment; filename=waitlist-{datetime.utcnow():%Y%m%d}.{extension}",
+            "ETag": etag
+        }
+        if gzip:
+            headers["Content-Encoding"] = "gzip"
         
-        entries = query.order_by(WaitlistEntry.position.asc()).all()
+        return StreamingResponse(
+            stream_export(export_db, result, format, gzip),
+            media_type="text/csv" if format == "csv" else "application/x-ndjson",
+            headers=headers
+        )
+    
+    response.headers["ETag"] = etag
+    try:
+        started = time.perf_counter()
+        export_data = await run_read(load_export_rows, active_only, version=version, sticky=sticky_keys(request))
+        metrics.observe_operation(f"export_{format}", time.perf_counter() - started)
         
         if format == "json":
-            export_data = []
-            for entry in entries:
-                export_data.append({
-                    "email": entry.email,
-                    "source": entry.source,
-                    "created_at": entry.created_at.isoformat(),
-                    "position": entry.position,
-                    "is_active": entry.is_active
-                })
-            
             return {
                 "success": True,
                 "format": "json",
@@ -386,23 +2656,20 @@ async def export_waitlist(
             }
         
         elif format == "csv":
-            from io import StringIO
-            import csv
-            
             output = StringIO()
             writer = csv.writer(output)
             
             # Write header
-            writer.writerow(["Email", "Source", "Created At", "Position", "Is Active"])
+            writer.writerow(EXPORT_CSV_HEADER)
             
             # Write data
-            for entry in entries:
+            for row in export_data:
                 writer.writerow([
-                    entry.email,
-                    entry.source,
-                    entry.created_at.isoformat(),
-                    entry.position,
-                    entry.is_active
+                    row["email"],
+                    row["source"],
+                    row["created_at"],
+                    row["position"],
+                    row["is_active"]
                 ])
             
             csv_content = output.getvalue()
@@ -412,43 +2679,113 @@ async def export_waitlist(
                 "success": True,
                 "format": "csv",
                 "data": csv_content,
-                "count": len(entries),
+                "count": len(export_data),
                 "exported_at": datetime.utcnow().isoformat()
             }
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to export data: {str(e)}")
 
+@app.get("/api/waitlist/changes", dependencies=[Depends(require_admin)])
+async def get_waitlist_changes(
+    request: Request,
+    since: Optional[str] = Query(None, description="cursor of the last change already processed"),
+    limit: Optional[int] = Query(None, ge=1)
+):
+    """Entries inserted, reactivated or unsubscribed since a cursor, streamed as NDJSON (admin endpoint).
+
+    Lines come in (updated_at, id) order and each carries the cursor to resume after it,
+    so an interrupted sync picks up where it stopped. Every entry appears once, with its
+    latest state; changes younger than CHANGES_SETTLE_SECONDS are left for the next call.
+    Entries reactivated before the reactivated_at column existed are labelled inserts.
+    """
+    try:
+        after = decode_cursor(since) if since else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    until = datetime.utcnow() - timedelta(seconds=CHANGES_SETTLE_SECONDS)
+    try:
+        version = await current_version()
+        # The stream outlives the request, so its session is closed by stream_changes
+        changes_db, result = await open_read_cursor(
+            open_changes_cursor, after, until, limit, version=version, sticky=sticky_keys(request)
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to read changes: {str(e)}")
+    
+    return StreamingResponse(
+        stream_changes(changes_db, result),
+        media_type="application/x-ndjson",
+        headers={"X-Changes-Until": until.isoformat()}
+    )
+
+@app.get("/api/waitlist/stream")
+async def stream_waitlist(email: Optional[str] = Query(None, description="Also follow this entry's position")):
+    """Server-Sent Events feed of signup counts, per-source deltas and latest signups.
+
+    Sends a snapshot, then coalesced update events (at most one per SSE_UPDATE_INTERVAL_MS)
+    and heartbeat comments; with email, position events whenever that entry moves.
+    """
+    subscriber = live_feed.subscribe(email.lower().strip() if email else None)
+    if subscriber is None:
+        detail = "Server is shutting down, please reconnect" if live_feed.closed \
+            else "Too many live feed subscribers, please retry shortly"
+        raise HTTPException(status_code=503, detail=detail, headers={"Retry-After": "5"})
+    
+    return StreamingResponse(
+        live_feed.events(subscriber),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.get("/api/waitlist/position/{email}")
-async def get_position(email: str, db: Session = Depends(get_db)):
-    """Get specific user's position in waitlist"""
+async def get_position(email: str, request: Request, response: Response):
+    """Get specific user's position in waitlist (cached for CACHE_TTL_POSITION, dropped on writes)"""
     try:
         email = email.lower().strip()
-        
-        entry = db.query(WaitlistEntry).filter(
-            WaitlistEntry.email == email,
-            WaitlistEntry.is_active == True
-        ).first()
-        
-        if not entry:
+        if await definitely_not_active(email):
             raise HTTPException(status_code=404, detail="Email not found in waitlist")
         
-        total_active = db.query(WaitlistEntry).filter(WaitlistEntry.is_active == True).count()
+        version = await current_version()
+        etag = version_etag(version)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        response.headers["ETag"] = etag
         
-        return {
-            "success": True,
-            "email": email,
-            "position": entry.position,
-            "total_signups": total_active,
-            "joined_at": entry.created_at.isoformat(),
-            "source": entry.source
-        }
+        return await response_cache.get_or_compute(
+            "position", f"{version}:{email}", CACHE_TTL_POSITION,
+            lambda: run_read(lookup_position, email, version=version, sticky=sticky_keys(request, email))
+        )
         
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get position: {str(e)}")
 
+@app.post("/api/waitlist/positions", dependencies=[Depends(require_admin)])
+async def get_positions(lookup: PositionLookupRequest, request: Request):
+    """Positions for up to POSITION_LOOKUP_MAX_EMAILS emails, streamed as NDJSON in request order (admin endpoint).
+
+    All emails are resolved against one database snapshot, so every line carries the same
+    total_signups. Found entries get the GET /position body; unknown or invalid ones a
+    success=false line with a detail. Lines are resolved chunk by chunk as they are sent.
+    """
+    try:
+        version = await current_version()
+        # The stream outlives the request, so its session is closed by stream_positions
+        positions_db, state = await open_read_cursor(
+            open_positions_lookup, lookup.emails, version=version, sticky=sticky_keys(request)
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get positions: {str(e)}")
+    
+    return StreamingResponse(
+        stream_positions(positions_db, state),
+        media_type="application/x-ndjson",
+        headers={"X-Total-Signups": str(state["snapshot"]["total_active"])}
+    )
+
 if __name__ == "__main__":
     print("🚀 Starting SiikHub Waitlist API v2.0...")
     print("=" * 60)
@@ -456,10 +2793,12 @@ if __name__ == "__main__":
     print("📖 ReDoc Documentation: http://localhost:8000/redoc")
     print("❤️  Health Check: http://localhost:8000/health")
     print("📊 Statistics: http://localhost:8000/api/waitlist/stats")
+    print("🏭 Production: python start_api.py (multiple workers, graceful drain)")
     print("=" * 60)
     
+    # Development server; reload needs the app as an import string
     uvicorn.run(
-        app, 
+        "api_model:app", 
         host="0.0.0.0", 
         port=8000, 
         reload=True,
@@ -0,0 +1,128 @@
+import argparse
+import sys
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, text
+
+from api_model import (
+    ARCHIVE_BATCH_SIZE, ARCHIVE_RETENTION_DAYS, ArchivedEntry, SessionLocal, WaitlistEntry,
+    archive_inactive_entries, engine
+)
+
+SIZED_TABLES = ("waitlist_entries", "waitlist_archive")
+
+
+def parse_args():
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(
+        description="Move waitlist entries inactive past the retention period into waitlist_archive"
+    )
+    parser.add_argument("--retention-days", type=float, default=ARCHIVE_RETENTION_DAYS,
+                        help=f"Archive entries inactive for longer than this (default: {ARCHIVE_RETENTION_DAYS:g})")
+    parser.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE,
+                        help=f"Entries moved per transaction (default: {ARCHIVE_BATCH_SIZE})")
+    parser.add_argument("--dry-run", action="store_true", help="Only count the entries that would be archived")
+    parser.add_argument("--vacuum", action="store_true",
+                        help="VACUUM afterwards to reclaim the space (SQLite rewrites the file and blocks writers meanwhile)")
+    return parser.parse_args()
+
+def relation_sizes(connection) -> dict:
+    """Bytes used by each sized table and by each of its indexes"""
+    sizes = {table: {"table": 0, "indexes": {}} for table in SIZED_TABLES}
+    if connection.dialect.name == "sqlite":
+        owners = dict(connection.exec_driver_sql(
+            "SELECT name, tbl_name FROM sqlite_master WHERE type IN ('table', 'index')"
+        ).fetchall())
+        for name, size in connection.exec_driver_sql("SELECT name, SUM(pgsize) FROM dbstat GROUP BY name"):
+            table = owners.get(name)
+            if table not in sizes:
+                continue
+            if name == table:
+                sizes[table]["table"] = size
+            else:
+                sizes[table]["indexes"][name] = size
+    elif connection.dialect.name == "postgresql":
+        for table in SIZED_TABLES:
+            sizes[table]["table"] = connection.execute(
+                text("SELECT pg_relation_size(CAST(:table AS regclass))"), {"table": table}
+            ).scalar()
+            sizes[table]["indexes"] = dict(connection.execute(text(
+                "SELECT CAST(indexrelid AS regclass)::text, pg_relation_size(indexrelid) "
+                "FROM pg_index WHERE indrelid = CAST(:table AS regclass)"
+            ), {"table": table}).fetchall())
+    else:
+        raise ValueError(f"No size report for the {connection.dialect.name} dialect")
+    return sizes
+
+def format_bytes(size: int) -> str:
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+def print_sizes(before: dict, after: dict):
+    for table in SIZED_TABLES:
+        print(f"   🗃️  {table}: {format_bytes(before[table]['table'])} → {format_bytes(after[table]['table'])}")
+        for index in sorted(set(before[table]["indexes"]) | set(after[table]["indexes"])):
+            was = before[table]["indexes"].get(index, 0)
+            now = after[table]["indexes"].get(index, 0)
+            print(f"      {index}: {format_bytes(was)} → {format_bytes(now)}")
+
+def vacuum():
+    with engine.connect() as connection:
+        connection = connection.execution_options(isolation_level="AUTOCOMMIT")
+        if connection.dialect.name == "sqlite":
+            connection.exec_driver_sql("VACUUM")
+        else:
+            for table in SIZED_TABLES:
+                connection.exec_driver_sql(f"VACUUM (ANALYZE) {table}")
+
+def main():
+    args = parse_args()
+    cutoff = datetime.utcnow() - timedelta(days=args.retention_days)
+
+    print(f"🗄️  Archiving entries inactive since before {cutoff:%Y-%m-%d %H:%M} "
+          f"from {engine.url.render_as_string(hide_password=True)}")
+
+    db = SessionLocal()
+    try:
+        eligible = db.query(func.count(WaitlistEntry.id)).filter(
+            WaitlistEntry.is_active == False,
+            WaitlistEntry.updated_at < cutoff
+        ).scalar()
+        if args.dry_run:
+            print(f"   📋 {eligible} entries would be archived")
+            return 0
+
+        before = relation_sizes(db.connection())
+        db.commit()
+        started = time.perf_counter()
+        archived = archive_inactive_entries(db, cutoff, args.batch_size)
+        elapsed = time.perf_counter() - started
+
+        if args.vacuum:
+            print("   🧹 Vacuuming...")
+            vacuum()
+        after = relation_sizes(db.connection())
+
+        remaining = db.query(func.count(WaitlistEntry.id)).scalar()
+        archive_rows = db.query(func.count(ArchivedEntry.id)).scalar()
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        db.close()
+
+    print(f"   ✅ Archived: {archived} entries in {elapsed:.2f}s")
+    print(f"   📊 waitlist_entries now holds {remaining} rows, waitlist_archive {archive_rows}")
+    print_sizes(before, after)
+    return 0
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        print("\n👋 Archiving cancelled by user")
+        sys.exit(1)
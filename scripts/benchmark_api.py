@@ -0,0 +1,267 @@
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+# Weighted mix of operations driven by every worker
+WORKLOAD_MIX = {
+    "signup": 30,
+    "duplicate_signup": 10,
+    "position": 25,
+    "stats": 15,
+    "entries": 8,
+    "entries_offset": 2,
+    "export": 1,
+    "unsubscribe": 9,
+}
+
+# Database-bound mix: signups keep the writer busy while every read goes to the database
+READ_WRITE_MIX = {
+    "signup": 40,
+    "position": 25,
+    "entries": 20,
+    "stats": 15,
+}
+
+WORKLOAD_MIXES = {"default": WORKLOAD_MIX, "read-write": READ_WRITE_MIX}
+
+# Response cache TTLs zeroed by --no-cache
+CACHE_TTL_SETTINGS = ("CACHE_TTL_STATS", "CACHE_TTL_HEALTH", "CACHE_TTL_POSITION", "CACHE_TTL_VERSION")
+
+# Statuses that count as a correct answer for each operation
+EXPECTED_STATUS = {
+    "position": {200, 404},
+    "unsubscribe": {200, 404},
+}
+
+
+def parse_args():
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(
+        description="Benchmark the waitlist API in-process against a temporary SQLite database"
+    )
+    parser.add_argument("--sizes", default="10000",
+                        help="Comma-separated table sizes to seed, e.g. 10000,100000,1000000")
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent clients (default: 32)")
+    parser.add_argument("--requests", type=int, default=5000, help="Requests per table size (default: 5000)")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for the workload")
+    parser.add_argument("--mix", choices=sorted(WORKLOAD_MIXES), default="default",
+                        help="Workload mix; read-write measures concurrent database reads and writes")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Disable the response cache so every read reaches the database")
+    parser.add_argument("--database-url",
+                        help="Database to benchmark against (default: a fresh temporary SQLite file per size); "
+                             "takes a single --sizes value, since the seeded rows stay in it")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    return parser.parse_args()
+
+def git_revision():
+    """Commit being benchmarked, so reports from different commits can be compared"""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return None
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+def summarize(samples, elapsed):
+    """Throughput and latency percentiles (ms) for one operation"""
+    latencies = sorted(latency for latency, _ in samples)
+    errors = sum(1 for _, ok in samples if not ok)
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "throughput_rps": round(len(samples) / elapsed, 2) if elapsed else None,
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3) if latencies else None,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3) if latencies else None,
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3) if latencies else None,
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3) if latencies else None,
+    }
+
+def seed_table(api_model, size):
+    """Fill the waitlist with size entries through the bulk import path"""
+    sources = ["website", "mobile", "social", "referral", "api"]
+    importer = api_model.BulkImporter("ndjson", batch_size=5000)
+    lines = (
+        json.dumps({"email": f"seed{i}@example.com", "source": sources[i % len(sources)]})
+        for i in range(size)
+    )
+
+    db = api_model.SessionLocal()
+    try:
+        api_model.run_bulk_import(db, lines, importer)
+    finally:
+        db.close()
+
+async def run_workload(api_model, size, args):
+    """Drive the mixed workload with args.concurrency clients and collect samples"""
+    import httpx
+
+    rng = random.Random(args.seed)
+    mix = WORKLOAD_MIXES[args.mix]
+    operations = list(mix)
+    weights = [mix[name] for name in operations]
+    samples = {name: [] for name in operations}
+    remaining = [args.requests]
+    signup_counter = [0]
+
+    def seeded_email():
+        return f"seed{rng.randrange(size)}@example.com" if size else "seed0@example.com"
+
+    async def perform(client, operation, state):
+        if operation == "signup":
+            signup_counter[0] += 1
+            return await client.post("/api/waitlist/signup", json={
+                "email": f"bench{signup_counter[0]}.{args.seed}@example.com", "source": "website"
+            })
+        if operation == "duplicate_signup":
+            return await client.post("/api/waitlist/signup", json={"email": seeded_email(), "source": "website"})
+        if operation == "position":
+            return await client.get(f"/api/waitlist/position/{seeded_email()}")
+        if operation == "stats":
+            return await client.get("/api/waitlist/stats")
+        if operation == "entries":
+            params = {"limit": 100}
+            if state.get("cursor"):
+                params["cursor"] = state["cursor"]
+            response = await client.get("/api/waitlist/entries", params=params)
+            state["cursor"] = response.headers.get("X-Next-Cursor")
+            return response
+        if operation == "entries_offset":
+            return await client.get("/api/waitlist/entries", params={
+                "limit": 100, "skip": rng.randrange(max(size, 1))
+            })
+        if operation == "export":
+            async with client.stream("GET", "/api/waitlist/export", params={"format": "csv", "stream": "true"}) as response:
+                async for _ in response.aiter_bytes():
+                    pass
+            return response
+        if operation == "unsubscribe":
+            return await client.delete(f"/api/waitlist/unsubscribe/{seeded_email()}")
+        raise ValueError(f"Unknown operation: {operation}")
+
+    async def worker(client):
+        state = {}
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            operation = rng.choices(operations, weights)[0]
+            started = time.perf_counter()
+            try:
+                response = await perform(client, operation, state)
+                ok = response.status_code in EXPECTED_STATUS.get(operation, {200})
+            except Exception:
+                ok = False
+            samples[operation].append((time.perf_counter() - started, ok))
+
+    transport = httpx.ASGITransport(app=api_model.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+
+    all_samples = [sample for operation_samples in samples.values() for sample in operation_samples]
+    return {
+        "duration_s": round(elapsed, 3),
+        "overall": summarize(all_samples, elapsed),
+        "endpoints": {name: summarize(samples[name], elapsed) for name in operations if samples[name]},
+    }
+
+async def benchmark_size(size, args):
+    """Seed a fresh database with size entries and run the workload against it"""
+    if args.database_url:
+        return await benchmark_database(size, args, args.database_url)
+    with tempfile.TemporaryDirectory(prefix="waitlist-bench-") as database_dir:
+        return await benchmark_database(size, args, f"sqlite:///{os.path.join(database_dir, 'benchmark.db')}")
+
+async def benchmark_database(size, args, database_url):
+    """Seed database_url with size entries and run the workload against it"""
+    os.environ["DATABASE_URL"] = database_url
+
+    # Every benchmark request comes from one client address, which the signup limits would throttle
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    if args.no_cache:
+        for setting in CACHE_TTL_SETTINGS:
+            os.environ[setting] = "0"
+
+    # api_model binds its engine at import time, so each size gets a fresh import
+    sys.modules.pop("api_model", None)
+    import api_model
+
+    try:
+        print(f"🌱 Seeding {size} entries...", file=sys.stderr)
+        seed_started = time.perf_counter()
+        seed_table(api_model, size)
+        seed_seconds = time.perf_counter() - seed_started
+
+        print(f"🏁 Running {args.requests} requests with {args.concurrency} clients...", file=sys.stderr)
+        async with api_model.lifespan(api_model.app):
+            result = await run_workload(api_model, size, args)
+    finally:
+        api_model.engine.dispose()
+
+    result = {
+        "table_size": size,
+        "seed_seconds": round(seed_seconds, 3),
+        "database": {
+            "backend": api_model.engine.dialect.name,
+            "pool": api_model.db_pool_settings,
+            "sqlite_pragmas": api_model.db_pragmas if api_model.engine.dialect.name == "sqlite" else None,
+        },
+        **result
+    }
+    print(f"   ✅ {result['overall']['throughput_rps']} req/s, p99 {result['overall']['p99_ms']} ms",
+          file=sys.stderr)
+    return result
+
+async def main():
+    args = parse_args()
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    if args.database_url and len(sizes) > 1:
+        print("❌ --database-url keeps the rows seeded for each size, so pass a single --sizes value",
+              file=sys.stderr)
+        return 1
+
+    print("🚀 SiikHub Waitlist API benchmark", file=sys.stderr)
+    print("=" * 60, file=sys.stderr)
+
+    report = {
+        "revision": git_revision(),
+        "python": sys.version.split()[0],
+        "concurrency": args.concurrency,
+        "requests_per_size": args.requests,
+        "workload_mix": WORKLOAD_MIXES[args.mix],
+        "response_cache": not args.no_cache,
+        "runs": [],
+    }
+    for size in sizes:
+        report["runs"].append(await benchmark_size(size, args))
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as report_file:
+            report_file.write(output + "\n")
+        print(f"📝 Report written to {os.path.abspath(args.output)}", file=sys.stderr)
+    else:
+        print(output)
+    return 0
+
+if __name__ == "__main__":
+    try:
+        sys.exit(asyncio.run(main()))
+    except KeyboardInterrupt:
+        print("\n👋 Benchmark cancelled by user", file=sys.stderr)
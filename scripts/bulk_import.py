@@ -0,0 +1,74 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+from api_model import BULK_BATCH_SIZE, BulkImporter, SessionLocal, count_active, run_bulk_import
+
+
+def parse_args():
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(
+        description="Import waitlist signups from a CSV or NDJSON file into DATABASE_URL"
+    )
+    parser.add_argument("path", help="CSV/NDJSON file to import, or - to read stdin")
+    parser.add_argument("--format", choices=["csv", "ndjson"],
+                        help="Input format (default: guessed from the file extension, csv for stdin)")
+    parser.add_argument("--source", default="website",
+                        help="Source for rows that do not name one (default: website)")
+    parser.add_argument("--batch-size", type=int, default=BULK_BATCH_SIZE,
+                        help=f"Rows per insert batch (default: {BULK_BATCH_SIZE})")
+    parser.add_argument("--report", help="Also write the full JSON report to this file")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+
+    input_format = args.format
+    if input_format is None:
+        input_format = "ndjson" if args.path.endswith((".ndjson", ".jsonl")) else "csv"
+
+    print(f"📥 Importing {args.path} as {input_format} (batches of {args.batch_size})...")
+
+    importer = BulkImporter(input_format, default_source=args.source, batch_size=args.batch_size)
+    db = SessionLocal()
+    started = time.perf_counter()
+
+    try:
+        if args.path == "-":
+            report = run_bulk_import(db, sys.stdin, importer)
+        else:
+            with open(args.path, encoding="utf-8-sig", newline="") as source_file:
+                report = run_bulk_import(db, source_file, importer)
+        total_active = count_active(db)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        db.close()
+
+    elapsed = time.perf_counter() - started
+
+    print(f"   ✅ Inserted: {report['inserted']}")
+    print(f"   🔁 Duplicates in input: {report['duplicates_in_input']}")
+    print(f"   📋 Already on waitlist: {report['already_on_waitlist']}")
+    print(f"   ❌ Invalid rows: {report['error_count']}")
+    for error in report["errors"][:20]:
+        print(f"      row {error['row']}: {error['email']} - {error['error']}")
+    print(f"   📊 Active signups now: {total_active}")
+    print(f"   ⏱️  {report['rows']} rows in {elapsed:.2f}s")
+
+    if args.report:
+        with open(args.report, "w") as report_file:
+            json.dump(report, report_file, indent=2)
+        print(f"   📝 Report written to {os.path.abspath(args.report)}")
+
+    return 0
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        print("\n👋 Import cancelled by user")
+        sys.exit(1)
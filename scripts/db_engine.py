@@ -0,0 +1,105 @@
+from typing import List, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import URL
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import QueuePool
+
+# Dialects whose connections live in this process and cannot go stale underneath the pool
+LOCAL_BACKENDS = ("sqlite",)
+
+
+def is_memory_sqlite(url: URL) -> bool:
+    if url.get_backend_name() != "sqlite":
+        return False
+    return url.database in (None, "", ":memory:") or url.query.get("mode") == "memory"
+
+
+def sqlite_pragmas(journal_mode: str = "wal", synchronous: str = "normal", busy_timeout_ms: int = 5000,
+                   mmap_size: int = 0, cache_size: int = 0) -> List[str]:
+    """PRAGMA statements run on every new SQLite connection; falsy values keep SQLite's default"""
+    pragmas = []
+    if journal_mode:
+        pragmas.append(f"PRAGMA journal_mode={journal_mode}")
+    if synchronous:
+        pragmas.append(f"PRAGMA synchronous={synchronous}")
+    if busy_timeout_ms:
+        pragmas.append(f"PRAGMA busy_timeout={int(busy_timeout_ms)}")
+    if mmap_size:
+        pragmas.append(f"PRAGMA mmap_size={int(mmap_size)}")
+    if cache_size:
+        # Negative values are KiB, positive values pages
+        pragmas.append(f"PRAGMA cache_size={int(cache_size)}")
+    return pragmas
+
+
+def install_pragmas(sync_engine, pragmas: List[str]):
+    if not pragmas:
+        return
+
+    @event.listens_for(sync_engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+
+def pool_options(url: URL, pool_size: int = 5, max_overflow: int = 10, pool_timeout: float = 30.0,
+                 pool_recycle: int = -1, pre_ping: Optional[bool] = None) -> dict:
+    """create_engine pool arguments for url; pre_ping=None enables it for network databases only"""
+    if is_memory_sqlite(url):
+        # SQLAlchemy picks a pool that keeps the single in-memory database alive
+        return {}
+    if pre_ping is None:
+        pre_ping = url.get_backend_name() not in LOCAL_BACKENDS
+    return {
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": pool_timeout,
+        "pool_recycle": pool_recycle,
+        "pool_pre_ping": pre_ping,
+    }
+
+
+def create_db_engine(url: URL, is_async: bool = False, pool: Optional[dict] = None,
+                     pragmas: Optional[List[str]] = None):
+    """Engine for url with explicit pool settings; pragmas apply to SQLite only"""
+    options = pool_options(url, **(pool or {}))
+    is_sqlite = url.get_backend_name() == "sqlite"
+
+    if is_async:
+        created = create_async_engine(url, **options)
+        sync_engine = created.sync_engine
+    else:
+        # Pooled SQLite connections are handed between the DB threadpool's threads
+        connect_args = {"check_same_thread": False} if is_sqlite else {}
+        created = sync_engine = create_engine(url, connect_args=connect_args, **options)
+
+    if is_sqlite:
+        install_pragmas(sync_engine, pragmas or [])
+    return created
+
+
+def pool_stats(engine) -> dict:
+    """Checked-out connections against the pool's capacity; saturation near 1.0 means requests queue"""
+    pool = engine.pool
+    stats = {"pool": type(pool).__name__}
+    if not isinstance(pool, QueuePool):
+        return stats
+
+    size = pool.size()
+    max_overflow = getattr(pool, "_max_overflow", 0)
+    checked_out = pool.checkedout()
+    stats.update({
+        "size": size,
+        "max_overflow": max_overflow,
+        "checked_out": checked_out,
+        "checked_in": pool.checkedin(),
+        "overflow": max(0, pool.overflow()),
+        "capacity": size + max_overflow if max_overflow >= 0 else None,
+    })
+    stats["saturation"] = round(checked_out / stats["capacity"], 3) if stats["capacity"] else None
+    return stats
@@ -0,0 +1,105 @@
+import sys
+from array import array
+from bisect import bisect_left
+from hashlib import blake2b
+from typing import Iterable, Optional
+
+
+def email_hash(email: str) -> int:
+    """64-bit hash of a normalized email"""
+    return int.from_bytes(blake2b(email.encode(), digest_size=8).digest(), "big")
+
+
+def build_hashes(emails: Iterable[str]) -> array:
+    """Sorted hash array for a stream of emails"""
+    hashes = array("Q", (email_hash(email) for email in emails))
+    return array("Q", sorted(hashes))
+
+
+class EmailIndex:
+    """In-process membership index over active emails.
+
+    The bulk of the set is a sorted array of 64-bit hashes (8 bytes per email);
+    writes since it was built are kept as exact per-email overrides. A hash match
+    only means "probably active" and must be confirmed by the database, but a miss
+    is definite, provided every change since the build is known here: that holds
+    while the waitlist version equals the version at build time plus the bumps
+    recorded locally (see is_fresh). Writes from other processes make the index
+    stale until the next rebuild, and so does a local write that committed before a
+    build's snapshot but was recorded after begin_build: the replay counts it twice.
+    """
+
+    def __init__(self, compact_after: int = 10000):
+        self.base = array("Q")
+        self.overrides = {}
+        self.version = None
+        self.local_bumps = 0
+        self.compact_after = compact_after
+        self.building = False
+        self.pending = []
+
+    @property
+    def ready(self) -> bool:
+        return self.version is not None
+
+    def might_be_active(self, email: str) -> bool:
+        """False means definitely not active (when fresh); True needs a database check"""
+        active = self.overrides.get(email)
+        if active is not None:
+            return active
+        value = email_hash(email)
+        index = bisect_left(self.base, value)
+        return index < len(self.base) and self.base[index] == value
+
+    def is_fresh(self, current_version: int) -> bool:
+        return self.ready and not self.building and current_version == self.version + self.local_bumps
+
+    def record(self, emails: Iterable[str], active: bool, bumps: int = 1):
+        """Apply a committed local write that bumped the waitlist version `bumps` times"""
+        emails = list(emails)
+        if self.building:
+            self.pending.append((emails, active, bumps))
+        for email in emails:
+            self.overrides[email] = active
+        self.local_bumps += bumps
+
+    @property
+    def needs_compaction(self) -> bool:
+        return len(self.overrides) > max(self.compact_after, len(self.base) // 10)
+
+    def begin_build(self):
+        self.building = True
+        self.pending = []
+
+    def finish_build(self, version: Optional[int], hashes: Optional[array]):
+        """Swap in a freshly built base (None after a failed build) and replay writes made meanwhile"""
+        pending, self.pending, self.building = self.pending, [], False
+        if hashes is None:
+            return
+        self.base = hashes
+        self.overrides = {}
+        self.version = version
+        self.local_bumps = 0
+        for emails, active, bumps in pending:
+            self.record(emails, active, bumps)
+
+    def stats(self) -> dict:
+        base_bytes = self.base.buffer_info()[1] * self.base.itemsize
+        # Rough size of the override dict and its keys
+        override_bytes = sys.getsizeof(self.overrides) + sum(
+            sys.getsizeof(email) for email in self.overrides
+        )
+        entries = len(self.base) + len(self.overrides)
+        total_bytes = base_bytes + override_bytes
+        per_email = total_bytes / entries if entries else float(self.base.itemsize)
+        return {
+            "ready": self.ready,
+            "building": self.building,
+            "version": self.version,
+            "local_bumps": self.local_bumps,
+            "base_entries": len(self.base),
+            "overrides": len(self.overrides),
+            "memory_bytes": total_bytes,
+            "bytes_per_email": round(per_email, 2),
+            "mb_per_million_emails": round(per_email * 1_000_000 / (1024 * 1024), 2),
+        }
@@ -0,0 +1,203 @@
+import argparse
+import re
+import sys
+from datetime import datetime, timedelta
+
+from fastapi import HTTPException
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from api_model import (
+    WaitlistSignupRequest, archive_inactive_batch, collect_stats, collect_timeseries, count_all_entries,
+    deactivate_entry, engine, list_entries, lookup_position, lookup_positions, lookup_repeat_signup,
+    next_positions_chunk, open_changes_cursor, open_export_cursor, open_positions_lookup, read_feed_counts,
+    reconcile_counters, register_signup
+)
+
+SAMPLE_EMAIL = "explain.sample@example.com"
+
+# Tables that grow with the waitlist; a full scan of one is a regression
+HOT_TABLES = ("waitlist_entries", "position_blocks", "waitlist_archive")
+
+EXPLAIN_PREFIX = {
+    "sqlite": "EXPLAIN QUERY PLAN ",
+    "postgresql": "EXPLAIN ",
+}
+
+# A hot table access only counts as indexed when the index is searched with a condition:
+# SQLite's "SEARCH t USING [COVERING] INDEX ... (cond)", or a PostgreSQL Index [Only] Scan
+# with an Index Cond. "SCAN t USING [COVERING] INDEX" walks the whole index
+SQLITE_SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+)")
+POSTGRES_SCAN = re.compile(r"(Seq Scan|Index Only Scan|Index Scan)(?: Backward)?(?: using \w+)? on (\w+)")
+
+# Operations that walk a hot table from end to end by design, and why that is bounded or intended
+EXPECTED_FULL_SCANS = {
+    ("POST /api/waitlist/signup", "position_blocks"): "first block only, the walk stops at LIMIT 1",
+    ("POST /api/waitlist/positions", "position_blocks"): "reads the block index, one row per block",
+    ("GET /api/waitlist/entries", "waitlist_entries"): "first page, stops at the page size",
+    ("GET /api/waitlist/entries?active_only=false", "waitlist_entries"): "first page, stops at the page size",
+    ("GET /api/waitlist/export", "waitlist_entries"): "exports every entry",
+    ("counter reconciliation", "waitlist_entries"): "recounts every entry",
+    ("counter reconciliation", "waitlist_archive"): "recounts every archived entry",
+    ("archive_inactive.py", "position_blocks"): "maps archived rows onto the block index",
+}
+
+CAPTURED_PREFIXES = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")
+
+
+def parse_args():
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(
+        description="Print query plans for each endpoint's SQL against DATABASE_URL and fail on full table scans"
+    )
+    parser.add_argument("--sql", action="store_true", help="Print each statement in full")
+    return parser.parse_args()
+
+def run_positions_lookup(db: Session, emails):
+    """Resolve a batch position lookup to the end, as its stream would"""
+    lookup = open_positions_lookup(db, emails)
+    while next_positions_chunk(db, lookup) is not None:
+        pass
+
+def hot_operations():
+    """Endpoint and the sync body it runs, ordered so a sample signup exists for the lookups"""
+    signup = WaitlistSignupRequest(email=SAMPLE_EMAIL, source="website")
+    client_info = {"ip_address": "203.0.113.7", "user_agent": "explain_queries"}
+    today = datetime.utcnow().date()
+    yesterday = datetime.utcnow() - timedelta(days=1)
+    return [
+        ("POST /api/waitlist/signup", lambda db: register_signup(db, signup, client_info)),
+        ("POST /api/waitlist/signup (repeat)", lambda db: lookup_repeat_signup(db, SAMPLE_EMAIL)),
+        ("GET /api/waitlist/position/{email}", lambda db: lookup_position(db, SAMPLE_EMAIL)),
+        ("POST /api/waitlist/positions", lambda db: run_positions_lookup(db, [SAMPLE_EMAIL, "missing@example.com"])),
+        ("GET /api/waitlist/stream?email=", lambda db: lookup_positions(db, [SAMPLE_EMAIL])),
+        ("GET /api/waitlist/stream", read_feed_counts),
+        ("GET /api/waitlist/entries", lambda db: list_entries(db, 0, 100, True)),
+        ("GET /api/waitlist/entries?cursor=", lambda db: list_entries(db, 0, 100, True, (yesterday, 0))),
+        ("GET /api/waitlist/entries?active_only=false", lambda db: list_entries(db, 0, 100, False)),
+        ("GET /api/waitlist/export", lambda db: open_export_cursor(db, True).close()),
+        ("GET /api/waitlist/changes", lambda db: open_changes_cursor(db, None, datetime.utcnow()).close()),
+        ("GET /api/waitlist/changes?since=", lambda db: open_changes_cursor(db, (yesterday, 0), datetime.utcnow()).close()),
+        ("GET /api/waitlist/stats", collect_stats),
+        ("GET /api/waitlist/stats/timeseries", lambda db: collect_timeseries(db, today - timedelta(days=30), today, "day")),
+        ("GET /health", count_all_entries),
+        ("DELETE /api/waitlist/unsubscribe/{email}", lambda db: deactivate_entry(db, SAMPLE_EMAIL)),
+        ("counter reconciliation", reconcile_counters),
+        ("archive_inactive.py", lambda db: archive_inactive_batch(db, datetime.utcnow(), 100)),
+    ]
+
+def capture_statements(db: Session, operation) -> list:
+    """Run operation and return the distinct statements it sent, with their parameters"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if executemany or not statement.lstrip().upper().startswith(CAPTURED_PREFIXES):
+            return
+        if all(statement != seen for seen, _ in statements):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        operation(db)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    return statements
+
+def explain(db: Session, statement: str, parameters) -> list:
+    """Plan lines for statement on the session's connection"""
+    dialect = engine.dialect.name
+    rows = db.connection().exec_driver_sql(EXPLAIN_PREFIX[dialect] + statement, parameters).fetchall()
+    if dialect == "sqlite":
+        # (id, parent, notused, detail): indent children under their parent
+        depth = {0: -1}
+        lines = []
+        for node_id, parent, _, detail in rows:
+            depth[node_id] = depth.get(parent, -1) + 1
+            lines.append("  " * depth[node_id] + detail)
+        return lines
+    return [row[0] for row in rows]
+
+def full_scans(plan: list) -> list:
+    """Hot tables the plan reads without an index condition"""
+    tables = []
+    if engine.dialect.name == "sqlite":
+        for line in plan:
+            match = SQLITE_SCAN.match(line.strip())
+            if match and match.group(1) in HOT_TABLES:
+                tables.append(match.group(1))
+        return tables
+
+    for index, line in enumerate(plan):
+        match = POSTGRES_SCAN.search(line)
+        if not match or match.group(2) not in HOT_TABLES:
+            continue
+        # A node's details follow it up to the next node ("->")
+        details = []
+        for detail in plan[index + 1:]:
+            if "->" in detail:
+                break
+            details.append(detail.strip())
+        if match.group(1) == "Seq Scan" or not any(detail.startswith("Index Cond:") for detail in details):
+            tables.append(match.group(2))
+    return tables
+
+def one_line(statement: str, width: int = 110) -> str:
+    flat = " ".join(statement.split())
+    return flat if len(flat) <= width else flat[:width - 3] + "..."
+
+def main():
+    args = parse_args()
+    dialect = engine.dialect.name
+    if dialect not in EXPLAIN_PREFIX:
+        print(f"❌ No EXPLAIN support for the {dialect} dialect")
+        return 1
+
+    print(f"🔬 Query plans for {engine.url.render_as_string(hide_password=True)}")
+    failures = []
+
+    # Everything, including the sample signup and the operations' own commits, is rolled back
+    with engine.connect() as connection:
+        outer = connection.begin()
+        if dialect == "sqlite":
+            # pysqlite defers BEGIN until the first write, which would let a SAVEPOINT release commit
+            connection.exec_driver_sql("BEGIN")
+        db = Session(bind=connection, autoflush=False, join_transaction_mode="create_savepoint")
+        try:
+            if dialect == "postgresql":
+                # Tiny test tables make sequential scans cheapest; ask for the plan an index gives
+                db.connection().exec_driver_sql("SET LOCAL enable_seqscan = off")
+            for name, operation in hot_operations():
+                print(f"\n📍 {name}")
+                try:
+                    statements = capture_statements(db, operation)
+                except HTTPException as e:
+                    print(f"   ⚠️  Skipped: {e.detail}")
+                    continue
+                for statement, parameters in statements:
+                    plan = explain(db, statement, parameters)
+                    scans = full_scans(plan)
+                    unexpected = [table for table in scans if (name, table) not in EXPECTED_FULL_SCANS]
+                    marker = "❌" if unexpected else "✅"
+                    print(f"   {marker} {statement.strip() if args.sql else one_line(statement)}")
+                    for line in plan:
+                        print(f"        {line}")
+                    for table in scans:
+                        if table in unexpected:
+                            failures.append((name, table))
+                        else:
+                            print(f"        ↳ expected full scan of {table}: {EXPECTED_FULL_SCANS[(name, table)]}")
+        finally:
+            db.close()
+            outer.rollback()
+
+    print()
+    if failures:
+        print(f"❌ {len(failures)} hot quer{'y' if len(failures) == 1 else 'ies'} fall back to a full table scan:")
+        for name, table in failures:
+            print(f"   - {name}: {table}")
+        return 1
+    print("✅ Every hot query searches an index, apart from the expected full scans")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,196 @@
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Optional, Tuple
+
+MAX_KEY_LENGTH = 255
+
+
+class IdempotencyKeyReused(Exception):
+    """Raised when a key is presented again with a different request body"""
+
+
+class IdempotencyKeyInProgress(Exception):
+    """Raised when another process is still running the key's request after the wait timeout"""
+
+
+def request_fingerprint(*parts) -> str:
+    return hashlib.sha256("\x1f".join(str(part) for part in parts).encode()).hexdigest()
+
+
+class MemoryIdempotencyStore:
+    """Completed responses in a fixed-size LRU, each kept for ttl seconds"""
+
+    def __init__(self, ttl: float = 86400.0, max_keys: int = 100000):
+        self.ttl = ttl
+        self.max_keys = max_keys
+        self.records = OrderedDict()
+
+    async def get(self, key: str) -> Optional[Tuple[str, Any]]:
+        record = self.records.get(key)
+        if record is None:
+            return None
+        fingerprint, response, expires_at = record
+        if expires_at <= time.monotonic():
+            del self.records[key]
+            return None
+        self.records.move_to_end(key)
+        return fingerprint, response
+
+    async def put(self, key: str, fingerprint: str, response: Any):
+        self.records[key] = (fingerprint, response, time.monotonic() + self.ttl)
+        self.records.move_to_end(key)
+        while len(self.records) > self.max_keys:
+            self.records.popitem(last=False)
+
+    async def claim(self, key: str, fingerprint: str) -> Optional[Tuple[str, Any]]:
+        """None when the caller should run the request, else the key's (fingerprint, response).
+
+        The response is None while another process is running the request. One process
+        never sees that here: IdempotencyManager already runs each key once per process.
+        """
+        return await self.get(key)
+
+    async def release(self, key: str, fingerprint: str):
+        """Give up a claim whose request failed, so a retry runs it again"""
+
+
+class DatabaseIdempotencyStore(MemoryIdempotencyStore):
+    """LRU in front of a database table, so replays survive restarts and reach every worker.
+
+    claim(key, fingerprint, not_before, stale_before), save(key, fingerprint, response,
+    purge_before) and release(key, fingerprint) are async callables supplied by the
+    application. claim inserts a pending record, so concurrent duplicates on other
+    workers see the key taken instead of running the request too; pending records
+    older than claim_timeout seconds belong to a request that died and are taken over.
+    Expired rows are purged every purge_every saves.
+    """
+
+    def __init__(
+        self,
+        claim: Callable[[str, str, datetime, datetime], Awaitable[Optional[Tuple[str, Any]]]],
+        save: Callable[[str, str, Any, Optional[datetime]], Awaitable[None]],
+        release: Callable[[str, str], Awaitable[None]],
+        ttl: float = 86400.0,
+        max_keys: int = 100000,
+        purge_every: int = 1000,
+        claim_timeout: float = 60.0
+    ):
+        super().__init__(ttl, max_keys)
+        self.claim_key = claim
+        self.save = save
+        self.release_key = release
+        self.purge_every = purge_every
+        self.claim_timeout = claim_timeout
+        self.saves = 0
+
+    async def claim(self, key: str, fingerprint: str) -> Optional[Tuple[str, Any]]:
+        record = await self.get(key)
+        if record is None:
+            now = datetime.utcnow()
+            record = await self.claim_key(
+                key, fingerprint, now - timedelta(seconds=self.ttl), now - timedelta(seconds=self.claim_timeout)
+            )
+            if record is not None and record[1] is not None:
+                await self.remember(key, *record)
+        return record
+
+    async def release(self, key: str, fingerprint: str):
+        await self.release_key(key, fingerprint)
+
+    async def remember(self, key: str, fingerprint: str, response: Any):
+        await super().put(key, fingerprint, response)
+
+    async def put(self, key: str, fingerprint: str, response: Any):
+        self.saves += 1
+        purge_before = None
+        if self.saves % self.purge_every == 0:
+            purge_before = datetime.utcnow() - timedelta(seconds=self.ttl)
+        await self.save(key, fingerprint, response, purge_before)
+        await self.remember(key, fingerprint, response)
+
+
+class IdempotencyManager:
+    """Runs each idempotency key's request once and replays its response.
+
+    Completed responses come from the store; a duplicate that arrives while the
+    first request is still running waits for that result instead of running again,
+    in this process on the first request's future and elsewhere by polling the
+    store's claim for up to wait_timeout seconds. Failures are not stored, and a
+    duplicate whose first request was cancelled runs it itself, so a retry after
+    an error executes normally.
+    """
+
+    def __init__(self, store, wait_timeout: float = 10.0):
+        self.store = store
+        self.wait_timeout = wait_timeout
+        self.inflight = {}
+
+    async def run(self, key: str, fingerprint: str, compute: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """(response, replayed) for key; raises IdempotencyKeyReused on a body mismatch"""
+        while key in self.inflight:
+            pending_fingerprint, future = self.inflight[key]
+            if pending_fingerprint != fingerprint:
+                raise IdempotencyKeyReused("Idempotency-Key is in use by a different request")
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # Only the first request was cancelled: run the request here instead
+                if not future.cancelled() or asyncio.current_task().cancelling():
+                    raise
+
+        # Registered before the store lookup, so duplicates arriving meanwhile wait on this one
+        future = asyncio.get_running_loop().create_future()
+        self.inflight[key] = (fingerprint, future)
+        claimed = False
+        try:
+            record = await self.claim(key, fingerprint)
+            if record is not None:
+                stored_fingerprint, response = record
+                if stored_fingerprint != fingerprint:
+                    raise IdempotencyKeyReused("Idempotency-Key was already used with a different request")
+                outcome = (response, True)
+            else:
+                claimed = True
+                response = await compute()
+                await self.store.put(key, fingerprint, response)
+                outcome = (response, False)
+        except Exception as e:
+            if claimed:
+                await self.release(key, fingerprint)
+            future.set_exception(e)
+            # Nobody may be waiting; mark the exception as retrieved
+            future.exception()
+            raise
+        except BaseException:
+            if claimed:
+                await self.release(key, fingerprint)
+            future.cancel()
+            raise
+        else:
+            future.set_result((outcome[0], True))
+            return outcome
+        finally:
+            self.inflight.pop(key, None)
+
+    async def claim(self, key: str, fingerprint: str) -> Optional[Tuple[str, Any]]:
+        """The store's claim, polled while another process is running the same request"""
+        deadline = time.monotonic() + self.wait_timeout
+        delay = 0.05
+        while True:
+            record = await self.store.claim(key, fingerprint)
+            if record is None or record[1] is not None or record[0] != fingerprint:
+                return record
+            if time.monotonic() >= deadline:
+                raise IdempotencyKeyInProgress("A request with this Idempotency-Key is still running")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 1.0)
+
+    async def release(self, key: str, fingerprint: str):
+        # Shielded: a cancelled request still frees its claim; one left behind expires after claim_timeout
+        try:
+            await asyncio.shield(self.store.release(key, fingerprint))
+        except Exception as e:
+            print(f"⚠️  Could not release Idempotency-Key {key!r}: {e}")
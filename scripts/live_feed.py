@@ -0,0 +1,219 @@
+import asyncio
+import json
+from collections import deque
+from typing import Awaitable, Callable, Dict, Iterable, Optional
+
+_CLOSED = object()
+
+
+def sse_event(event: str, data) -> str:
+    """Format one Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+def mask_email(email: str) -> str:
+    """Keep just enough of an address for a public feed: a***@example.com"""
+    local, _, domain = email.partition("@")
+    return f"{local[:1]}***@{domain}"
+
+
+class Subscriber:
+    """One SSE client: a bounded queue of pre-formatted messages"""
+
+    __slots__ = ("queue", "email", "position", "dropped")
+
+    def __init__(self, queue_size: int, email: Optional[str] = None):
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.email = email
+        self.position = None
+        self.dropped = False
+
+    def offer(self, message) -> bool:
+        try:
+            self.queue.put_nowait(message)
+            return True
+        except asyncio.QueueFull:
+            self.dropped = True
+            return False
+
+
+class LiveFeed:
+    """In-process pub/sub behind /api/waitlist/stream.
+
+    Write paths publish_signup(); a single broadcaster task wakes at most once per
+    interval while anyone is subscribed, and when the waitlist version moved it loads
+    the counters once, formats one coalesced update and fans the same string out to
+    every subscriber. Followers get fresh positions only after a write that reorders
+    the queue rather than appending to it. Version and counters come from the database, so writes made by
+    other workers show up too; the latest-signups list is local to this worker.
+    Subscribers whose queue is full are dropped rather than slowing everyone down.
+    """
+
+    def __init__(
+        self,
+        get_version: Callable[[], Awaitable[int]],
+        load_counts: Callable[[], Awaitable[dict]],
+        load_positions: Callable[[Iterable[str]], Awaitable[Dict[str, Optional[int]]]],
+        interval_ms: float = 1000.0,
+        heartbeat_seconds: float = 15.0,
+        queue_size: int = 32,
+        max_subscribers: int = 10000,
+        latest_limit: int = 10
+    ):
+        self.get_version = get_version
+        self.load_counts = load_counts
+        self.load_positions = load_positions
+        self.interval = interval_ms / 1000.0
+        self.heartbeat = heartbeat_seconds
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self.subscribers = set()
+        self.latest = deque(maxlen=latest_limit)
+        self.last_version = None
+        self.last_counts = None
+        self.has_subscribers = asyncio.Event()
+        self.task = None
+        self.closed = False
+        self.dropped_total = 0
+
+    def start(self):
+        self.closed = False
+        self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """End every stream and refuse new subscribers; safe to call more than once"""
+        self.closed = True
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+        for subscriber in list(self.subscribers):
+            subscriber.dropped = True
+            try:
+                subscriber.queue.put_nowait(_CLOSED)
+            except asyncio.QueueFull:
+                pass
+        self.subscribers.clear()
+
+    def publish_signup(self, email: str, source: str, joined_at: str):
+        """Record a signup for the next update's latest_signups list"""
+        if self.subscribers:
+            self.latest.append({"email": mask_email(email), "source": source, "joined_at": joined_at})
+
+    def subscribe(self, email: Optional[str] = None) -> Optional[Subscriber]:
+        if self.closed or len(self.subscribers) >= self.max_subscribers:
+            return None
+        subscriber = Subscriber(self.queue_size, email)
+        self.subscribers.add(subscriber)
+        self.has_subscribers.set()
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        self.subscribers.discard(subscriber)
+
+    async def snapshot(self, subscriber: Subscriber) -> str:
+        """Initial message for a new subscriber"""
+        if self.last_counts is None:
+            # Baseline for the broadcaster's deltas; the version is read first so it never runs ahead
+            version = await self.get_version()
+            self.last_counts = await self.load_counts()
+            self.last_version = version
+        counts = self.last_counts
+        data = {"total_signups": counts["total"], "active_signups": counts["active"], "sources": counts["sources"]}
+        if subscriber.email is not None:
+            positions = await self.load_positions([subscriber.email])
+            subscriber.position = positions.get(subscriber.email)
+            data["position"] = subscriber.position
+        return sse_event("snapshot", data)
+
+    async def events(self, subscriber: Subscriber):
+        """Messages for one subscriber: a snapshot, then updates and heartbeats until dropped"""
+        try:
+            yield await self.snapshot(subscriber)
+            while not subscriber.dropped:
+                try:
+                    message = await asyncio.wait_for(subscriber.queue.get(), self.heartbeat)
+                except asyncio.TimeoutError:
+                    yield ": heartbeat\n\n"
+                    continue
+                if message is _CLOSED:
+                    break
+                yield message
+            if subscriber.dropped:
+                yield sse_event("dropped", {"reason": "client too slow or server shutting down, reconnect"})
+        finally:
+            self.unsubscribe(subscriber)
+
+    async def _run(self):
+        while True:
+            if not self.subscribers:
+                self.has_subscribers.clear()
+                self.last_version = None
+                self.last_counts = None
+                self.latest.clear()
+                await self.has_subscribers.wait()
+
+            await asyncio.sleep(self.interval)
+            try:
+                await self._tick()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠️  Live feed update failed: {e}")
+
+    async def _tick(self):
+        version = await self.get_version()
+        if version == self.last_version:
+            return
+
+        counts = await self.load_counts()
+        previous = self.last_counts
+        self.last_version = version
+        self.last_counts = counts
+        if previous is None:
+            return
+
+        sources = set(counts["sources"]) | set(previous["sources"])
+        source_deltas = {
+            source: counts["sources"].get(source, 0) - previous["sources"].get(source, 0)
+            for source in sorted(sources)
+        }
+        message = sse_event("update", {
+            "version": version,
+            "total_signups": counts["total"],
+            "active_signups": counts["active"],
+            "total_delta": counts["total"] - previous["total"],
+            "active_delta": counts["active"] - previous["active"],
+            "source_deltas": {source: delta for source, delta in source_deltas.items() if delta},
+            "latest_signups": list(self.latest),
+        })
+        self.latest.clear()
+
+        for subscriber in list(self.subscribers):
+            if not subscriber.offer(message):
+                self._drop(subscriber)
+
+        # New signups only append to the queue; departures and rejoins bump the reorder count,
+        # even when they cancel out in the totals
+        if counts["reorders"] != previous["reorders"]:
+            await self._push_positions()
+
+    async def _push_positions(self):
+        followers = [subscriber for subscriber in self.subscribers if subscriber.email is not None]
+        if not followers:
+            return
+
+        positions = await self.load_positions({subscriber.email for subscriber in followers})
+        for subscriber in followers:
+            position = positions.get(subscriber.email)
+            if position != subscriber.position:
+                subscriber.position = position
+                if not subscriber.offer(sse_event("position", {"position": position})):
+                    self._drop(subscriber)
+
+    def _drop(self, subscriber: Subscriber):
+        self.subscribers.discard(subscriber)
+        self.dropped_total += 1
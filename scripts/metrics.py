@@ -0,0 +1,369 @@
+import os
+import threading
+import time
+from contextvars import ContextVar
+from typing import Callable, Optional, Sequence, Tuple
+
+DEFAULT_LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _Sharded:
+    """Per-thread storage so hot-path updates never take a lock.
+
+    Each thread writes only to its own shard; render() merges the shards. The lock
+    is taken once per thread, when its shard is created.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards = []
+        self._lock = threading.Lock()
+
+    def _shard(self) -> dict:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = {}
+            with self._lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+        return shard
+
+
+class Counter(_Sharded):
+    """Monotonic counter keyed by a tuple of label values"""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__()
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+
+    def inc(self, amount: float = 1.0, labels: Tuple = ()):
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0.0) + amount
+
+    def collect(self):
+        totals = {}
+        for shard in list(self._shards):
+            for labels, value in list(shard.items()):
+                totals[labels] = totals.get(labels, 0.0) + value
+        return [(self.name, labels, (), value) for labels, value in sorted(totals.items())]
+
+
+class Gauge:
+    """Point-in-time value, only updated from the event loop thread"""
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+
+    def inc(self, amount: float = 1.0, labels: Tuple = ()):
+        self.values[labels] = self.values.get(labels, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, labels: Tuple = ()):
+        self.inc(-amount, labels)
+
+    def set(self, value: float, labels: Tuple = ()):
+        self.values[labels] = value
+
+    def collect(self):
+        return [(self.name, labels, (), value) for labels, value in sorted(self.values.items())]
+
+
+class Histogram(_Sharded):
+    """Cumulative-bucket histogram keyed by a tuple of label values"""
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        super().__init__()
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, labels: Tuple = ()):
+        shard = self._shard()
+        series = shard.get(labels)
+        if series is None:
+            # [per-bucket counts..., +Inf count, sum]
+            series = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[index] += 1
+                break
+        else:
+            series[len(self.buckets)] += 1
+        series[-1] += value
+
+    def collect(self):
+        merged = {}
+        for shard in list(self._shards):
+            for labels, series in list(shard.items()):
+                total = merged.setdefault(labels, [0] * len(series[:-1]) + [0.0])
+                for index, value in enumerate(series):
+                    total[index] += value
+
+        samples = []
+        for labels, series in sorted(merged.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                samples.append((self.name + "_bucket", labels, (("le", _format_value(bound)),), cumulative))
+            count = cumulative + series[len(self.buckets)]
+            samples.append((self.name + "_bucket", labels, (("le", "+Inf"),), count))
+            samples.append((self.name + "_sum", labels, (), series[-1]))
+            samples.append((self.name + "_count", labels, (), count))
+        return samples
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered in the Prometheus text exposition format.
+
+    Values are aggregated per worker process; scrape each worker separately.
+    """
+
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            for sample_name, labels, extra, value in metric.collect():
+                pairs = list(zip(metric.labelnames, labels)) + list(extra)
+                label_text = ",".join(f'{key}="{_escape(str(val))}"' for key, val in pairs)
+                suffix = "{" + label_text + "}" if label_text else ""
+                lines.append(f"{sample_name}{suffix} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == int(value):
+        return str(int(value))
+    return repr(float(value))
+
+
+def resident_memory_bytes() -> Optional[int]:
+    """Current RSS of this process (Linux), else its peak RSS where the platform reports one"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak if os.uname().sysname == "Darwin" else peak * 1024
+
+
+def process_age_seconds() -> Optional[float]:
+    """Seconds since this process was created (Linux), including interpreter start and imports"""
+    try:
+        with open("/proc/self/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return uptime - int(fields[19]) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class RequestSqlStats:
+    """SQL work attributed to the current request"""
+
+    __slots__ = ("statements", "seconds")
+
+    def __init__(self):
+        self.statements = 0
+        self.seconds = 0.0
+
+
+# Set by the middleware; copied into DB threads and greenlets with the context
+current_sql_stats: ContextVar[Optional[RequestSqlStats]] = ContextVar("current_sql_stats", default=None)
+
+
+class WaitlistMetrics:
+    """The metrics this API records, plus the hooks that feed them"""
+
+    def __init__(self):
+        self.registry = MetricsRegistry()
+        self.request_latency = self.registry.histogram(
+            "waitlist_http_request_duration_seconds", "HTTP request latency",
+            ("method", "route", "status")
+        )
+        self.requests_in_flight = self.registry.gauge(
+            "waitlist_http_requests_in_flight", "HTTP requests currently being served"
+        )
+        self.request_sql_statements = self.registry.histogram(
+            "waitlist_http_request_sql_statements", "SQL statements issued per HTTP request",
+            ("route",), buckets=(0, 1, 2, 3, 5, 8, 13, 21, 50, 100, 1000)
+        )
+        self.request_sql_time = self.registry.histogram(
+            "waitlist_http_request_sql_seconds", "Time spent in SQL per HTTP request", ("route",)
+        )
+        self.sql_statements = self.registry.counter(
+            "waitlist_db_statements_total", "SQL statements executed"
+        )
+        self.sql_time = self.registry.histogram(
+            "waitlist_db_statement_duration_seconds", "SQL statement execution time"
+        )
+        self.pool_checkout_wait = self.registry.histogram(
+            "waitlist_db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection"
+        )
+        self.operation_duration = self.registry.histogram(
+            "waitlist_operation_duration_seconds",
+            "Duration of heavy maintenance and export operations", ("operation",),
+            buckets=DEFAULT_LATENCY_BUCKETS + (30.0, 60.0, 300.0)
+        )
+        self.cache_lookups = self.registry.counter(
+            "waitlist_cache_lookups_total", "Response cache lookups by result (hit, miss, coalesced)",
+            ("namespace", "result")
+        )
+        self.rate_limited = self.registry.counter(
+            "waitlist_rate_limited_total", "Requests rejected by a rate limit rule", ("rule",)
+        )
+        self.read_routes = self.registry.counter(
+            "waitlist_read_routes_total",
+            "Replica-eligible reads by routing decision (replica, lagging, sticky, unavailable, fallback)",
+            ("route",)
+        )
+        self.worker_startup = self.registry.gauge(
+            "waitlist_worker_startup_seconds", "Time from process start until this worker was ready"
+        )
+        self.resident_memory = self.registry.gauge(
+            "waitlist_worker_resident_memory_bytes", "Resident memory of this worker process"
+        )
+        self.pool_connections = self.registry.gauge(
+            "waitlist_db_pool_connections", "Pooled connections by state (checked_out, checked_in, overflow)",
+            ("engine", "state")
+        )
+        self.pool_capacity = self.registry.gauge(
+            "waitlist_db_pool_capacity", "Connections a pool may hand out (size plus overflow)", ("engine",)
+        )
+        self.pools = {}
+
+    def render(self) -> str:
+        rss = resident_memory_bytes()
+        if rss is not None:
+            self.resident_memory.set(rss)
+        for name, read_stats in self.pools.items():
+            stats = read_stats()
+            for state in ("checked_out", "checked_in", "overflow"):
+                if state in stats:
+                    self.pool_connections.set(stats[state], (name, state))
+            if stats.get("capacity") is not None:
+                self.pool_capacity.set(stats["capacity"], (name,))
+        return self.registry.render()
+
+    def watch_pool(self, name: str, read_stats: Callable[[], dict]):
+        """Sample a pool's stats (see db_engine.pool_stats) on every scrape"""
+        self.pools[name] = read_stats
+
+    def observe_operation(self, operation: str, seconds: float):
+        self.operation_duration.observe(seconds, (operation,))
+
+    def record_cache_lookup(self, namespace: str, result: str):
+        self.cache_lookups.inc(labels=(namespace, result))
+
+    def record_rate_limited(self, rule: str):
+        self.rate_limited.inc(labels=(rule,))
+
+    def record_read_route(self, route: str):
+        self.read_routes.inc(labels=(route,))
+
+    def instrument_engine(self, engine):
+        """Hook statement timing and pool checkout wait into a sync Engine"""
+        from sqlalchemy import event
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            elapsed = time.perf_counter() - conn.info["query_started"].pop()
+            self.sql_statements.inc()
+            self.sql_time.observe(elapsed)
+            stats = current_sql_stats.get()
+            if stats is not None:
+                stats.statements += 1
+                stats.seconds += elapsed
+
+        # Engine.raw_connection() is where a Connection waits on the pool
+        raw_connection = engine.raw_connection
+
+        def timed_raw_connection(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return raw_connection(*args, **kwargs)
+            finally:
+                self.pool_checkout_wait.observe(time.perf_counter() - started)
+
+        engine.raw_connection = timed_raw_connection
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, in-flight requests and per-request SQL work"""
+
+    def __init__(self, app, metrics: WaitlistMetrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metrics = self.metrics
+        status = [500]
+        stats = RequestSqlStats()
+        token = current_sql_stats.set(stats)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        metrics.requests_in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            metrics.requests_in_flight.dec()
+            current_sql_stats.reset(token)
+
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            metrics.request_latency.observe(elapsed, (scope["method"], route, str(status[0])))
+            metrics.request_sql_statements.observe(stats.statements, (route,))
+            metrics.request_sql_time.observe(stats.seconds, (route,))
@@ -0,0 +1,49 @@
+import argparse
+import os
+import sys
+
+# Migrations run here, explicitly, rather than as a side effect of importing the app
+os.environ["AUTO_MIGRATE"] = "false"
+
+from api_model import MIGRATIONS, engine
+from migrations import migration_status, run_migrations
+
+
+def parse_args():
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(
+        description="Apply pending schema migrations to DATABASE_URL"
+    )
+    parser.add_argument("--status", action="store_true",
+                        help="List migrations and when each was applied, without applying anything")
+    return parser.parse_args()
+
+def print_status():
+    pending = 0
+    for migration in migration_status(engine, MIGRATIONS):
+        if migration["applied_at"] is None:
+            pending += 1
+            print(f"   ⏳ {migration['version']:>3}  {migration['name']}  (pending)")
+        else:
+            print(f"   ✅ {migration['version']:>3}  {migration['name']}  ({migration['applied_at']:%Y-%m-%d %H:%M:%S})")
+    print(f"   📋 {pending} pending")
+
+def main():
+    args = parse_args()
+
+    print(f"🗄️  Schema migrations for {engine.url.render_as_string(hide_password=True)}")
+    if args.status:
+        print_status()
+        return 0
+
+    applied = run_migrations(engine, MIGRATIONS, log=lambda line: print(f"   {line}"))
+    if not applied:
+        print("   ✅ Schema is up to date")
+    return 0
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        print("\n👋 Migration cancelled by user")
+        sys.exit(1)
@@ -0,0 +1,205 @@
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, List, NamedTuple, Optional
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, inspect, select, text
+from sqlalchemy.exc import DatabaseError, IntegrityError
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+migrations_metadata = MetaData()
+
+# pg_advisory_lock key held while a process migrates
+MIGRATION_LOCK_ID = 0x5117
+
+schema_migrations = Table(
+    "schema_migrations",
+    migrations_metadata,
+    Column("version", Integer, primary_key=True),
+    Column("name", String, nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+class Migration(NamedTuple):
+    """One schema change; apply(connection) runs inside the transaction that records it,
+    except for index steps on PostgreSQL, which build concurrently before being recorded"""
+    version: int
+    name: str
+    apply: Callable
+
+
+def create_tables(*tables) -> Callable:
+    """Migration step creating model-declared tables, with their indexes, that do not exist yet"""
+    def apply(connection):
+        for table in tables:
+            table.create(connection, checkfirst=True)
+    return apply
+
+
+def add_columns(table, *names: str) -> Callable:
+    """Migration step adding model-declared columns that a table does not have yet"""
+    def apply(connection):
+        existing = {column["name"] for column in inspect(connection).get_columns(table.name)}
+        for name in names:
+            if name not in existing:
+                column_type = table.c[name].type.compile(dialect=connection.dialect)
+                connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {name} {column_type}"))
+    return apply
+
+
+class IndexStep:
+    """Migration step that only creates or drops indexes.
+
+    On PostgreSQL run_migrations runs it outside the migration's transaction with
+    CONCURRENTLY, so a large table keeps taking writes while an index builds.
+    """
+
+    def __init__(self, create=(), drop=()):
+        self.create = create
+        self.drop = drop
+
+    def __call__(self, connection, concurrently: bool = False):
+        keyword = " CONCURRENTLY" if concurrently else ""
+        for name in self.drop:
+            connection.execute(text(f"DROP INDEX{keyword} IF EXISTS {name}"))
+        for index in self.create:
+            if not concurrently:
+                connection.execute(CreateIndex(index, if_not_exists=True))
+                continue
+            drop_invalid_index(connection, index.name)
+            options = index.dialect_options["postgresql"]
+            options["concurrently"] = True
+            try:
+                connection.execute(CreateIndex(index, if_not_exists=True))
+            finally:
+                options["concurrently"] = False
+
+
+def drop_invalid_index(connection, name: str):
+    """Drop an index an interrupted CONCURRENTLY build left invalid; IF NOT EXISTS would keep it"""
+    valid = connection.execute(
+        text("SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)"), {"name": name}
+    ).scalar()
+    if valid is False:
+        connection.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+
+
+def create_indexes(*indexes) -> IndexStep:
+    """Migration step creating model-declared indexes that do not exist yet"""
+    return IndexStep(create=indexes)
+
+
+def drop_indexes(*names: str) -> IndexStep:
+    """Migration step dropping indexes by name, if present"""
+    return IndexStep(drop=names)
+
+
+@contextmanager
+def migration_lock(engine):
+    """Serialize migrating processes on PostgreSQL; on SQLite the version row's write lock does"""
+    if engine.dialect.name != "postgresql":
+        yield
+        return
+    with engine.connect() as connection:
+        connection = connection.execution_options(isolation_level="AUTOCOMMIT")
+        connection.execute(text("SELECT pg_advisory_lock(:id)"), {"id": MIGRATION_LOCK_ID})
+        try:
+            yield
+        finally:
+            connection.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": MIGRATION_LOCK_ID})
+
+
+def ensure_migrations_table(engine, attempts: int = 3):
+    """Create schema_migrations, tolerating workers that start together and race to create it"""
+    for attempt in range(attempts):
+        try:
+            with engine.begin() as connection:
+                connection.execute(CreateTable(schema_migrations, if_not_exists=True))
+            return
+        except DatabaseError:
+            if attempt == attempts - 1:
+                raise
+            time.sleep(0.1 * (attempt + 1))
+
+
+def applied_migrations(engine) -> dict:
+    """Applied versions mapped to when they were applied"""
+    with engine.connect() as connection:
+        rows = connection.execute(select(schema_migrations.c.version, schema_migrations.c.applied_at))
+        return {version: applied_at for version, applied_at in rows}
+
+
+def migration_status(engine, migrations: List[Migration]) -> List[dict]:
+    ensure_migrations_table(engine)
+    applied = applied_migrations(engine)
+    return [
+        {"version": migration.version, "name": migration.name, "applied_at": applied.get(migration.version)}
+        for migration in sorted(migrations)
+    ]
+
+
+def run_migrations(engine, migrations: List[Migration], log: Optional[Callable[[str], None]] = print) -> List[int]:
+    """Apply pending migrations in version order and return the versions this call applied.
+
+    Each migration runs in its own transaction that first inserts its schema_migrations
+    row. A second process migrating at the same time blocks on that row and then hits
+    the primary key, so every migration is applied exactly once. On PostgreSQL, index
+    steps build concurrently outside a transaction instead, and an advisory lock keeps
+    other processes waiting until the run is over.
+    """
+    ensure_migrations_table(engine)
+    online = engine.dialect.name == "postgresql"
+    newly_applied = []
+
+    with migration_lock(engine):
+        applied = applied_migrations(engine)
+        for migration in sorted(migrations):
+            if migration.version in applied:
+                continue
+            started = time.perf_counter()
+            if online and isinstance(migration.apply, IndexStep):
+                if not apply_online(engine, migration):
+                    continue
+            elif not apply_in_transaction(engine, migration):
+                continue
+            newly_applied.append(migration.version)
+            if log is not None:
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                log(f"📦 Applied migration {migration.version}: {migration.name} ({elapsed_ms:.0f} ms)")
+
+    return newly_applied
+
+
+def record_migration(connection, migration: Migration):
+    connection.execute(schema_migrations.insert().values(
+        version=migration.version, name=migration.name, applied_at=datetime.utcnow()
+    ))
+
+
+def apply_in_transaction(engine, migration: Migration) -> bool:
+    """Record and apply a migration atomically; False when another process already applied it"""
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        try:
+            record_migration(connection, migration)
+        except IntegrityError:
+            # Another worker applied this version while we waited for its row
+            transaction.rollback()
+            return False
+        with transaction:
+            migration.apply(connection)
+    return True
+
+
+def apply_online(engine, migration: Migration) -> bool:
+    """Run an index step concurrently, then record it; index steps are idempotent if interrupted"""
+    with engine.connect() as connection:
+        migration.apply(connection.execution_options(isolation_level="AUTOCOMMIT"), concurrently=True)
+    with engine.connect() as connection:
+        try:
+            with connection.begin():
+                record_migration(connection, migration)
+        except IntegrityError:
+            return False
+    return True
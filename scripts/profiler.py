@@ -0,0 +1,306 @@
+import asyncio
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import List, Optional
+
+PROFILE_ID_PATTERN = re.compile(r"^[0-9A-Za-z_-]+$")
+MAX_SQL_STATEMENTS = 1000
+MAX_SQL_LENGTH = 2000
+MAX_STACK_DEPTH = 128
+
+
+class ProfileCapture:
+    """Stack samples and SQL statements collected while one request runs"""
+
+    def __init__(self, method: str, path: str, sampled: bool):
+        self.method = method
+        self.path = path
+        self.sampled = sampled
+        self.started_at = datetime.now(timezone.utc)
+        # Threads currently working for this request: the event loop plus any DB thread
+        self.threads = {threading.get_ident()}
+        self.stacks = {}
+        self.samples = 0
+        self.sql = []
+        self.sql_dropped = 0
+
+    def add_stack(self, stack: str):
+        self.stacks[stack] = self.stacks.get(stack, 0) + 1
+        self.samples += 1
+
+    def add_statement(self, statement: str, seconds: float):
+        if len(self.sql) >= MAX_SQL_STATEMENTS:
+            self.sql_dropped += 1
+            return
+        self.sql.append({
+            "statement": statement[:MAX_SQL_LENGTH],
+            "duration_ms": round(seconds * 1000, 3),
+            "thread": threading.current_thread().name,
+        })
+
+
+# Set by the middleware for requests being profiled; copied into DB threads with the context
+current_capture: ContextVar[Optional[ProfileCapture]] = ContextVar("current_capture", default=None)
+
+
+def call_in_capture(fn, *args, **kwargs):
+    """Run fn, attributing this thread's samples to the request being profiled (if any)"""
+    capture = current_capture.get()
+    if capture is None:
+        return fn(*args, **kwargs)
+
+    thread_id = threading.get_ident()
+    capture.threads.add(thread_id)
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        capture.threads.discard(thread_id)
+
+
+def fold_stack(frame) -> str:
+    """Collapse a frame chain into root-first `a;b;c` form, as used by flame graph tools"""
+    names = []
+    while frame is not None and len(names) < MAX_STACK_DEPTH:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class SamplingProfiler:
+    """Background thread that samples the stacks of threads working for profiled requests.
+
+    The sampler only wakes while at least one capture is active. Samples of the event
+    loop thread are shared by every request being profiled at that moment.
+    """
+
+    def __init__(self, interval_ms: float = 5.0):
+        self.interval = interval_ms / 1000.0
+        self.captures = set()
+        self.lock = threading.Lock()
+        self.active = threading.Event()
+        self.stopped = False
+        self.thread = None
+
+    def start(self):
+        if self.thread is None:
+            self.stopped = False
+            self.thread = threading.Thread(target=self._run, name="waitlist-profiler", daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        self.stopped = True
+        self.active.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def register(self, capture: ProfileCapture):
+        with self.lock:
+            self.captures.add(capture)
+            self.active.set()
+
+    def unregister(self, capture: ProfileCapture):
+        with self.lock:
+            self.captures.discard(capture)
+
+    def _run(self):
+        while not self.stopped:
+            self.active.wait()
+            time.sleep(self.interval)
+
+            with self.lock:
+                captures = list(self.captures)
+                if not captures:
+                    self.active.clear()
+                    continue
+
+            frames = sys._current_frames()
+            folded = {}
+            for capture in captures:
+                for thread_id in list(capture.threads):
+                    frame = frames.get(thread_id)
+                    if frame is None:
+                        continue
+                    if thread_id not in folded:
+                        folded[thread_id] = fold_stack(frame)
+                    capture.add_stack(folded[thread_id])
+
+
+class ProfileStore:
+    """Directory of JSON profiles, pruned oldest-first to stay under max_bytes"""
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+        # In-memory index (oldest first) so listing never reads the profiles themselves
+        self.index = []
+        for name in sorted(os.listdir(directory)):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(directory, name)
+            try:
+                with open(path) as profile_file:
+                    profile = json.load(profile_file)
+                self.index.append((self.summary(profile), os.path.getsize(path)))
+            except (OSError, ValueError, KeyError):
+                continue
+        self.total_bytes = sum(size for _, size in self.index)
+
+    @staticmethod
+    def summary(profile: dict) -> dict:
+        return {key: profile[key] for key in (
+            "id", "started_at", "method", "path", "route", "status", "duration_ms", "reason", "samples"
+        )} | {"sql_statements": len(profile["sql"])}
+
+    def path_for(self, profile_id: str) -> Optional[str]:
+        if not PROFILE_ID_PATTERN.match(profile_id):
+            return None
+        path = os.path.join(self.directory, f"{profile_id}.json")
+        return path if os.path.exists(path) else None
+
+    def save(self, profile: dict):
+        data = json.dumps(profile).encode()
+        path = os.path.join(self.directory, f"{profile['id']}.json")
+        temp_path = path + ".tmp"
+        with open(temp_path, "wb") as profile_file:
+            profile_file.write(data)
+        os.replace(temp_path, path)
+
+        with self.lock:
+            self.index.append((self.summary(profile), len(data)))
+            self.total_bytes += len(data)
+            while self.index and self.total_bytes > self.max_bytes:
+                oldest, size = self.index.pop(0)
+                self.total_bytes -= size
+                try:
+                    os.remove(os.path.join(self.directory, f"{oldest['id']}.json"))
+                except OSError:
+                    pass
+
+    def list(self) -> List[dict]:
+        with self.lock:
+            return [summary for summary, _ in reversed(self.index)]
+
+    def load(self, profile_id: str) -> Optional[dict]:
+        path = self.path_for(profile_id)
+        if path is None:
+            return None
+        try:
+            with open(path) as profile_file:
+                return json.load(profile_file)
+        except (OSError, ValueError):
+            return None
+
+
+def folded_output(profile: dict) -> str:
+    """Profile stacks in collapsed-stack format (input for flamegraph.pl, speedscope, ...)"""
+    return "".join(f"{stack} {count}\n" for stack, count in sorted(profile["stacks"].items()))
+
+
+class RequestProfiler:
+    """Decides which requests to profile and persists the interesting ones"""
+
+    def __init__(self, store: ProfileStore, sample_rate: float = 0.0, slow_ms: float = 0.0,
+                 interval_ms: float = 5.0, exclude_prefixes=("/metrics", "/admin")):
+        self.store = store
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self.interval_ms = interval_ms
+        self.exclude_prefixes = tuple(exclude_prefixes)
+        self.sampler = SamplingProfiler(interval_ms)
+
+    def instrument_engine(self, engine):
+        """Record the SQL issued by profiled requests on a sync Engine"""
+        from sqlalchemy import event
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            if current_capture.get() is not None:
+                conn.info.setdefault("profile_started", []).append(time.perf_counter())
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            capture = current_capture.get()
+            if capture is not None and conn.info.get("profile_started"):
+                capture.add_statement(statement, time.perf_counter() - conn.info["profile_started"].pop())
+
+    def begin(self, scope) -> Optional[ProfileCapture]:
+        if scope["path"].startswith(self.exclude_prefixes):
+            return None
+        sampled = self.sample_rate > 0 and random.random() < self.sample_rate
+        if not sampled and self.slow_ms <= 0:
+            return None
+        capture = ProfileCapture(scope["method"], scope["path"], sampled)
+        self.sampler.register(capture)
+        return capture
+
+    def finish(self, capture: ProfileCapture, scope, status: int, seconds: float):
+        self.sampler.unregister(capture)
+        duration_ms = seconds * 1000
+        slow = self.slow_ms > 0 and duration_ms >= self.slow_ms
+        if not (capture.sampled or slow):
+            return
+
+        started = capture.started_at
+        profile = {
+            "id": f"{started.strftime('%Y%m%dT%H%M%S%f')}-{uuid.uuid4().hex[:8]}",
+            "started_at": started.isoformat(),
+            "method": capture.method,
+            "path": capture.path,
+            "route": getattr(scope.get("route"), "path", None),
+            "status": status,
+            "duration_ms": round(duration_ms, 3),
+            "reason": "slow" if slow else "sampled",
+            "interval_ms": self.interval_ms,
+            "samples": capture.samples,
+            "stacks": capture.stacks,
+            "sql": capture.sql,
+            "sql_dropped": capture.sql_dropped,
+        }
+        # Disk I/O stays off the event loop
+        asyncio.get_running_loop().run_in_executor(None, self.store.save, profile)
+
+
+class ProfilerMiddleware:
+    """ASGI middleware capturing sampled or slow requests through a RequestProfiler"""
+
+    def __init__(self, app, profiler: RequestProfiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        capture = self.profiler.begin(scope)
+        if capture is None:
+            await self.app(scope, receive, send)
+            return
+
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        token = current_capture.set(capture)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_capture.reset(token)
+            self.profiler.finish(capture, scope, status[0], time.perf_counter() - started)
@@ -0,0 +1,148 @@
+import ipaddress
+import math
+import time
+from collections import OrderedDict
+from typing import Iterable, Optional, Tuple
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+def parse_limit(spec: Optional[str]) -> Optional[Tuple[float, float]]:
+    """'20/minute' -> (refill rate per second, burst); empty or 0 disables the limit"""
+    if not spec or spec.strip() in ("0", "off", "none"):
+        return None
+    count, _, period = spec.strip().partition("/")
+    seconds = PERIODS.get(period.strip() or "minute")
+    if seconds is None:
+        raise ValueError(f"Unknown rate limit period in {spec!r}, use one of {', '.join(PERIODS)}")
+    burst = float(count)
+    return burst / seconds, burst
+
+
+def subnet_key(ip_address: str) -> Optional[str]:
+    """The /24 (IPv4) or /64 (IPv6) network an address belongs to"""
+    try:
+        address = ipaddress.ip_address(ip_address)
+    except ValueError:
+        return None
+    prefix = 24 if address.version == 4 else 64
+    return str(ipaddress.ip_network(f"{address}/{prefix}", strict=False))
+
+
+class MemoryBuckets:
+    """Token buckets in a fixed-size LRU; a flood of new keys evicts the least recent ones"""
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self.buckets = OrderedDict()
+
+    async def take(self, key: str, rate: float, burst: float) -> float:
+        """Spend one token; returns 0 when allowed, else seconds until a token is available"""
+        now = time.monotonic()
+        tokens, updated_at = self.buckets.get(key, (burst, now))
+        tokens = min(burst, tokens + (now - updated_at) * rate)
+
+        retry_after = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            retry_after = (1 - tokens) / rate
+
+        self.buckets[key] = (tokens, now)
+        self.buckets.move_to_end(key)
+        if len(self.buckets) > self.max_keys:
+            self.buckets.popitem(last=False)
+        return retry_after
+
+    async def close(self):
+        self.buckets.clear()
+
+
+# Same algorithm as MemoryBuckets.take, atomic in Redis and timed by the Redis clock
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local updated_at = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated_at) * rate)
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    retry_after = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000))
+return tostring(retry_after)
+"""
+
+
+class RedisBuckets:
+    """Token buckets shared by every worker (needs the redis package); idle keys expire"""
+
+    def __init__(self, url: str, prefix: str = "waitlist:ratelimit:"):
+        import redis.asyncio as redis
+
+        self.client = redis.from_url(url)
+        self.script = self.client.register_script(TOKEN_BUCKET_SCRIPT)
+        self.prefix = prefix
+
+    async def take(self, key: str, rate: float, burst: float) -> float:
+        return float(await self.script(keys=[self.prefix + key], args=[rate, burst]))
+
+    async def close(self):
+        await self.client.aclose()
+
+
+def create_buckets(url: Optional[str], max_keys: int = 100000):
+    """Bucket store for RATE_LIMIT_URL: redis://... when available, else the in-process stand-in"""
+    if url and url.startswith(("redis://", "rediss://", "unix://")):
+        try:
+            return RedisBuckets(url)
+        except ImportError:
+            print("⚠️  RATE_LIMIT_URL names Redis but the redis package is not installed; limiting per worker")
+    return MemoryBuckets(max_keys)
+
+
+class RateLimited(Exception):
+    """Raised when a request exceeds one of its limits"""
+
+    def __init__(self, rule: str, retry_after: float):
+        super().__init__(f"Rate limit exceeded ({rule})")
+        self.rule = rule
+        self.retry_after = retry_after
+
+    @property
+    def retry_after_header(self) -> str:
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+class RateLimiter:
+    """Named token-bucket rules checked together; every bucket involved spends a token"""
+
+    def __init__(self, buckets, rules: dict):
+        self.buckets = buckets
+        self.rules = {name: limit for name, limit in rules.items() if limit is not None}
+        self.rejected = {name: 0 for name in self.rules}
+
+    async def check(self, keys: Iterable[Tuple[str, Optional[str]]]):
+        """Raise RateLimited for the rule needing the longest wait, if any is exhausted"""
+        denied = None
+        for rule, key in keys:
+            limit = self.rules.get(rule)
+            if limit is None or key is None:
+                continue
+            rate, burst = limit
+            retry_after = await self.buckets.take(f"{rule}:{key}", rate, burst)
+            if retry_after > 0 and (denied is None or retry_after > denied.retry_after):
+                denied = RateLimited(rule, retry_after)
+
+        if denied is not None:
+            self.rejected[denied.rule] += 1
+            raise denied
+
+    async def close(self):
+        await self.buckets.close()
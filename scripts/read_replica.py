@@ -0,0 +1,126 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Iterable, Optional
+
+
+class ReadRouter:
+    """Decides, read by read, whether the replica may answer instead of the primary.
+
+    A background task reads the replica's waitlist version every check_interval. A
+    read goes to the replica only when the last check succeeded, the replica's version
+    is within max_lag of the version the request is answering for (the one in its ETag
+    and cache key), and none of the request's sticky keys (client token, email) wrote
+    within the last sticky_seconds. Recent writers are remembered in this process only.
+    An error on the replica marks it unavailable until the next successful check.
+    """
+
+    def __init__(
+        self,
+        read_version: Callable[[], Awaitable[int]],
+        check_interval: float = 1.0,
+        max_lag: int = 0,
+        sticky_seconds: float = 5.0,
+        max_sticky_keys: int = 100000,
+        on_route: Optional[Callable[[str], None]] = None
+    ):
+        self.read_version = read_version
+        self.check_interval = check_interval
+        self.max_lag = max_lag
+        self.sticky_seconds = sticky_seconds
+        self.max_sticky_keys = max_sticky_keys
+        self.on_route = on_route
+        self.version = None
+        self.healthy = False
+        self.last_error = None
+        self.recent_writers = OrderedDict()
+        self.routes = {"replica": 0, "lagging": 0, "sticky": 0, "unavailable": 0, "fallback": 0}
+        self.task = None
+
+    def _record(self, route: str):
+        self.routes[route] += 1
+        if self.on_route is not None:
+            self.on_route(route)
+
+    def mark_write(self, *keys: Optional[str]):
+        """Keep these clients' reads on the primary for the next sticky_seconds"""
+        if self.sticky_seconds <= 0:
+            return
+        expires_at = time.monotonic() + self.sticky_seconds
+        for key in keys:
+            if key:
+                self.recent_writers[key] = expires_at
+                self.recent_writers.move_to_end(key)
+        while len(self.recent_writers) > self.max_sticky_keys:
+            self.recent_writers.popitem(last=False)
+
+    def is_sticky(self, keys: Iterable[Optional[str]]) -> bool:
+        now = time.monotonic()
+        for key in keys:
+            expires_at = self.recent_writers.get(key) if key else None
+            if expires_at is None:
+                continue
+            if expires_at > now:
+                return True
+            del self.recent_writers[key]
+        return False
+
+    def use_replica(self, version: int, sticky_keys: Iterable[Optional[str]] = ()) -> bool:
+        if not self.healthy or self.version is None:
+            self._record("unavailable")
+            return False
+        if self.version < version - self.max_lag:
+            self._record("lagging")
+            return False
+        if self.is_sticky(sticky_keys):
+            self._record("sticky")
+            return False
+        self._record("replica")
+        return True
+
+    def mark_failed(self, error: Exception):
+        """A read on the replica failed; the caller retries it on the primary"""
+        self.healthy = False
+        self.last_error = str(error)
+        self._record("fallback")
+
+    async def check(self):
+        try:
+            self.version = await self.read_version()
+            self.healthy = True
+            self.last_error = None
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.healthy = False
+            self.last_error = str(e)
+
+    async def start(self):
+        """First check before serving, then one every check_interval"""
+        await self.check()
+        self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.check_interval)
+            await self.check()
+
+    def stats(self) -> dict:
+        return {
+            "healthy": self.healthy,
+            "replica_version": self.version,
+            "last_error": self.last_error,
+            "max_lag": self.max_lag,
+            "sticky_seconds": self.sticky_seconds,
+            "sticky_clients": len(self.recent_writers),
+            "routes": dict(self.routes),
+        }
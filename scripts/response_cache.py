@@ -0,0 +1,160 @@
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Optional
+
+MISSING = object()
+
+
+class MemoryBackend:
+    """In-process LRU with per-entry expiry; only touched from the event loop thread"""
+
+    shared = False
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.counters = {}
+
+    async def get(self, key: str) -> Any:
+        item = self.entries.get(key)
+        if item is None:
+            return MISSING
+        value, expires_at = item
+        if expires_at <= time.monotonic():
+            del self.entries[key]
+            return MISSING
+        self.entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: Any, ttl: float):
+        self.entries[key] = (value, time.monotonic() + ttl)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    async def get_counter(self, key: str) -> int:
+        return self.counters.get(key, 0)
+
+    async def incr(self, key: str) -> int:
+        self.counters[key] = self.counters.get(key, 0) + 1
+        return self.counters[key]
+
+    async def close(self):
+        self.entries.clear()
+
+
+class RedisBackend:
+    """Cache shared by every worker, stored in Redis as JSON (needs the redis package)"""
+
+    shared = True
+
+    def __init__(self, url: str, prefix: str = "waitlist:cache:"):
+        import redis.asyncio as redis
+
+        self.client = redis.from_url(url)
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Any:
+        raw = await self.client.get(self.prefix + key)
+        return MISSING if raw is None else json.loads(raw)
+
+    async def set(self, key: str, value: Any, ttl: float):
+        await self.client.set(self.prefix + key, json.dumps(value), px=max(1, int(ttl * 1000)))
+
+    async def get_counter(self, key: str) -> int:
+        raw = await self.client.get(self.prefix + key)
+        return int(raw) if raw is not None else 0
+
+    async def incr(self, key: str) -> int:
+        return await self.client.incr(self.prefix + key)
+
+    async def close(self):
+        await self.client.aclose()
+
+
+def create_backend(url: Optional[str], max_entries: int = 10000):
+    """Backend for CACHE_URL: redis://... when available, else the in-process LRU stand-in"""
+    if url and url.startswith(("redis://", "rediss://", "unix://")):
+        try:
+            return RedisBackend(url)
+        except ImportError:
+            print("⚠️  CACHE_URL names Redis but the redis package is not installed; using the in-process cache")
+    return MemoryBackend(max_entries)
+
+
+class ResponseCache:
+    """Read-through cache for endpoint results, with per-namespace invalidation.
+
+    Keys embed their namespace's generation, so invalidate() makes every older entry
+    unreachable at once (they expire or get evicted later). Concurrent misses for the
+    same key share one computation. Values must be JSON-compatible when the backend
+    is shared.
+    """
+
+    def __init__(self, backend, on_lookup: Optional[Callable[[str, str], None]] = None):
+        self.backend = backend
+        self.on_lookup = on_lookup
+        self.inflight = {}
+        self.generations = {}
+        self.counts = {}
+
+    def _record(self, namespace: str, result: str):
+        counts = self.counts.setdefault(namespace, {"hit": 0, "miss": 0, "coalesced": 0})
+        counts[result] += 1
+        if self.on_lookup is not None:
+            self.on_lookup(namespace, result)
+
+    async def _generation(self, namespace: str) -> int:
+        if self.backend.shared:
+            return await self.backend.get_counter(f"generation:{namespace}")
+        return self.generations.get(namespace, 0)
+
+    async def get_or_compute(self, namespace: str, key: str, ttl: float,
+                             compute: Callable[[], Awaitable[Any]]) -> Any:
+        """Cached value for key, or compute() once for all concurrent callers and store it"""
+        if ttl <= 0:
+            return await compute()
+
+        cache_key = f"{namespace}:{await self._generation(namespace)}:{key}"
+        value = await self.backend.get(cache_key)
+        if value is not MISSING:
+            self._record(namespace, "hit")
+            return value
+
+        pending = self.inflight.get(cache_key)
+        if pending is not None:
+            self._record(namespace, "coalesced")
+            return await asyncio.shield(pending)
+
+        # Shielded so a disconnecting caller does not cancel the fill others are waiting on
+        self._record(namespace, "miss")
+        pending = asyncio.ensure_future(self._fill(cache_key, ttl, compute))
+        self.inflight[cache_key] = pending
+        return await asyncio.shield(pending)
+
+    async def _fill(self, cache_key: str, ttl: float, compute):
+        try:
+            value = await compute()
+            await self.backend.set(cache_key, value, ttl)
+            return value
+        finally:
+            self.inflight.pop(cache_key, None)
+
+    async def invalidate(self, *namespaces: str):
+        """Drop every cached value in the given namespaces"""
+        for namespace in namespaces:
+            if self.backend.shared:
+                await self.backend.incr(f"generation:{namespace}")
+            else:
+                self.generations[namespace] = self.generations.get(namespace, 0) + 1
+
+    def stats(self) -> dict:
+        return {
+            "backend": type(self.backend).__name__,
+            "namespaces": {namespace: dict(counts) for namespace, counts in self.counts.items()},
+        }
+
+    async def close(self):
+        await self.backend.close()
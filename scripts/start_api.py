@@ -1,64 +1,118 @@
-import subprocess
-import sys
+import argparse
+import importlib.util
 import os
+import sys
+
+import uvicorn
+
+REDIS_SCHEMES = ("redis://", "rediss://", "unix://")
+
+
+def available(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def default_workers() -> int:
+    """WEB_CONCURRENCY when set, else one worker per CPU this process may run on"""
+    configured = os.getenv("WEB_CONCURRENCY")
+    if configured:
+        return max(1, int(configured))
+    if hasattr(os, "sched_getaffinity"):
+        return max(1, len(os.sched_getaffinity(0)))
+    return max(1, os.cpu_count() or 1)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run the SiikHub Waitlist API in production")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=default_workers(),
+                        help="Worker processes (default: WEB_CONCURRENCY or the CPU count)")
+    parser.add_argument("--keep-alive", type=int, default=int(os.getenv("KEEP_ALIVE_SECONDS", "5")),
+                        help="Seconds an idle keep-alive connection stays open")
+    parser.add_argument("--backlog", type=int, default=int(os.getenv("LISTEN_BACKLOG", "2048")),
+                        help="Pending connections the listening socket queues")
+    parser.add_argument("--graceful-timeout", type=int, default=int(os.getenv("GRACEFUL_TIMEOUT", "30")),
+                        help="Seconds in-flight requests get to finish after a shutdown signal")
+    parser.add_argument("--forwarded-allow-ips", default=os.getenv("FORWARDED_ALLOW_IPS"),
+                        help="Comma-separated proxy addresses, or *, trusted to set X-Forwarded-For "
+                             "(default: FORWARDED_ALLOW_IPS, else only 127.0.0.1)")
+    parser.add_argument("--log-level", default=os.getenv("LOG_LEVEL", "info"))
+    parser.add_argument("--no-access-log", action="store_true",
+                        default=os.getenv("ACCESS_LOG", "true").lower() not in ("1", "true", "yes"))
+    return parser.parse_args()
+
+
+def warn_about_per_worker_state(workers: int):
+    """In-process stand-ins are not shared, so several workers each keep their own copy"""
+    if workers < 2:
+        return
+    if not (os.getenv("CACHE_URL") or "").startswith(REDIS_SCHEMES):
+        print("⚠️  CACHE_URL is not Redis: each worker caches responses separately")
+    rate_limit_url = os.getenv("RATE_LIMIT_URL", os.getenv("CACHE_URL")) or ""
+    if os.getenv("RATE_LIMIT_ENABLED", "true").lower() in ("1", "true", "yes") and \
+            not rate_limit_url.startswith(REDIS_SCHEMES):
+        print(f"⚠️  RATE_LIMIT_URL is not Redis: signup limits apply per worker (up to {workers}x)")
+    if os.getenv("IDEMPOTENCY_STORE", "memory") != "database":
+        print("⚠️  IDEMPOTENCY_STORE=memory: a retry that reaches another worker is not replayed")
 
-def install_requirements():
-    """Install required packages"""
-    packages = [
-        "fastapi",
-        "uvicorn[standard]",
-        "pydantic[email]",
-        "python-multipart",
-        "sqlalchemy",
-        "python-jose[cryptography]"
-    ]
-    
-    print("📦 Installing Python packages...")
-    for package in packages:
-        print(f"Installing {package}...")
-        try:
-            subprocess.check_call([sys.executable, "-m", "pip", "install", package], 
-                                stdout=subprocess.DEVNULL, 
-                                stderr=subprocess.DEVNULL)
-        except subprocess.CalledProcessError as e:
-            print(f"   ❌ Failed to install {package}: {e}")
-            return False
-    
-    print("   ✅ All packages installed successfully!")
-    return True
-
-def start_server():
-    """Start the FastAPI server"""
-    print("\n🚀 Starting SiikHub Waitlist API v2.0...")
+
+def warn_about_client_address(forwarded_allow_ips):
+    """Per-IP signup limits only mean something when the proxy's X-Forwarded-For is trusted"""
+    if forwarded_allow_ips:
+        return
+    if os.getenv("RATE_LIMIT_SIGNUP_IP") or os.getenv("RATE_LIMIT_SIGNUP_SUBNET"):
+        print("⚠️  FORWARDED_ALLOW_IPS is not set: behind a proxy every client shares the proxy's "
+              "address, so the per-IP signup limits apply to all clients at once")
+    else:
+        print("💡 Set FORWARDED_ALLOW_IPS to the proxy's address (* on Render) to enable per-IP signup limits")
+
+
+def start_server(args):
+    """Serve api_model:app with uvloop/httptools when installed"""
+    loop = "uvloop" if available("uvloop") else "asyncio"
+    http = "httptools" if available("httptools") else "h11"
+
+    print("🚀 Starting SiikHub Waitlist API v2.0...")
     print("=" * 60)
-    print("🌐 Server starting on http://localhost:8000")
-    print("📚 API Documentation: http://localhost:8000/docs")
-    print("📖 ReDoc Documentation: http://localhost:8000/redoc")
-    print("❤️  Health Check: http://localhost:8000/health")
-    print("📊 Statistics: http://localhost:8000/api/waitlist/stats")
+    print(f"🌐 Listening on http://{args.host}:{args.port}")
+    print(f"👷 Workers: {args.workers}  🔁 Event loop: {loop}  📡 HTTP parser: {http}")
+    print(f"⏱️  Keep-alive: {args.keep_alive}s  📥 Backlog: {args.backlog}  🛑 Graceful timeout: {args.graceful_timeout}s")
     print("=" * 60)
-    print("💡 Press Ctrl+C to stop the server")
-    print()
-    
-    # Change to the scripts directory to run the API
+    if loop == "asyncio" or http == "h11":
+        print("💡 pip install uvloop httptools for a faster event loop and HTTP parser")
+    warn_about_per_worker_state(args.workers)
+    warn_about_client_address(args.forwarded_allow_ips)
+
+    # Workers import api_model from the scripts directory
     script_dir = os.path.dirname(os.path.abspath(__file__))
     os.chdir(script_dir)
-    
-    # Run the API
-    try:
-        subprocess.run([sys.executable, "waitlist_api.py"])
-    except KeyboardInterrupt:
-        print("\n👋 Server stopped by user")
-    except Exception as e:
-        print(f"\n❌ Error running server: {e}")
+    sys.path.insert(0, script_dir)
+    # Workers read it too, to decide whether the per-IP signup limits are on by default
+    if args.forwarded_allow_ips:
+        os.environ["FORWARDED_ALLOW_IPS"] = args.forwarded_allow_ips
+
+    # Workers warm their DB pools before accepting connections; on SIGTERM they stop
+    # accepting, let in-flight requests finish, then flush queued signups
+    uvicorn.run(
+        "api_model:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        loop=loop,
+        http=http,
+        timeout_keep_alive=args.keep_alive,
+        backlog=args.backlog,
+        timeout_graceful_shutdown=args.graceful_timeout,
+        log_level=args.log_level,
+        access_log=not args.no_access_log,
+        proxy_headers=True,
+        forwarded_allow_ips=args.forwarded_allow_ips
+    )
+
 
 if __name__ == "__main__":
     try:
-        if install_requirements():
-            start_server()
-        else:
-            print("❌ Failed to install required packages. Please check your Python environment.")
+        start_server(parse_args())
     except KeyboardInterrupt:
-        print("\n👋 Setup cancelled by user")
-    except Exception as e:
-        print(f"❌ Error during setup: {e}")
+        print("\n👋 Server stopped by user")
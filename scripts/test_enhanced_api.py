@@ -1,10 +1,16 @@
 import requests
 import json
+import os
+import subprocess
+import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 # API base URL
 BASE_URL = "http://localhost:8000"
+# Admin endpoints (bulk import, batch positions, change feed) need the server's ADMIN_TOKEN
+ADMIN_HEADERS = {"X-Admin-Token": os.getenv("ADMIN_TOKEN", "")}
 
 def test_health_check():
     """Test comprehensive health check"""
@@ -58,6 +64,105 @@ def test_enhanced_signup():
         except Exception as e:
             print(f"❌ {case['email']}: Error - {e}")
 
+def test_concurrent_duplicate_signups():
+    """Test parallel signups for the same email resolve to one entry"""
+    print("\n⚡ Testing Concurrent Duplicate Signups...")
+    
+    email = f"race.{int(time.time())}@example.com"
+    
+    def signup(_):
+        return requests.post(
+            f"{BASE_URL}/api/waitlist/signup",
+            json={"email": email, "source": "website"}
+        )
+    
+    try:
+        with ThreadPoolExecutor(max_workers=10) as pool:
+            responses = list(pool.map(signup, range(10)))
+        
+        errors = [r for r in responses if r.status_code != 200]
+        successes = [r for r in responses if r.status_code == 200 and r.json()["success"]]
+        positions = {r.json()["position"] for r in responses if r.status_code == 200}
+        
+        if not errors and len(successes) == 1 and len(positions) == 1:
+            print(f"✅ {email}: 1 signup, {len(responses) - 1} duplicates, position #{positions.pop()}")
+        else:
+            print(f"❌ {email}: {len(errors)} errors, {len(successes)} successful signups, positions {sorted(positions)}")
+            
+    except Exception as e:
+        print(f"❌ Concurrent signup error: {e}")
+
+def test_bulk_import():
+    """Test CSV bulk import with duplicates and invalid rows"""
+    print("\n📥 Testing Bulk Import...")
+    
+    stamp = int(time.time())
+    csv_body = "\n".join([
+        "email,source",
+        f"bulk.one.{stamp}@example.com,website",
+        f"bulk.two.{stamp}@example.com,social",
+        f"bulk.one.{stamp}@example.com,website",  # Duplicate in input
+        "not-an-email,website",  # Invalid email
+    ])
+    
+    try:
+        response = requests.post(
+            f"{BASE_URL}/api/waitlist/bulk",
+            data=csv_body,
+            headers={"Content-Type": "text/csv", **ADMIN_HEADERS}
+        )
+        
+        if response.status_code == 200:
+            report = response.json()
+            print(f"✅ Inserted {report['inserted']}, duplicates {report['duplicates_in_input']}, errors {report['error_count']}")
+            for error in report["errors"]:
+                print(f"   row {error['row']}: {error['email']} - {error['error']}")
+        else:
+            print(f"❌ Bulk import failed: {response.json()}")
+            
+    except Exception as e:
+        print(f"❌ Bulk import error: {e}")
+
+def test_archived_bulk_import():
+    """Test that bulk importing an archived email restores it instead of adding a second entry"""
+    print("\n🗄️  Testing Bulk Import of an Archived Email...")
+    if not os.getenv("DATABASE_URL"):
+        print("⏭️  Skipped: set DATABASE_URL to the server's database so archive_inactive.py can run")
+        return
+    
+    email = f"archived.{int(time.time())}@example.com"
+    try:
+        requests.post(f"{BASE_URL}/api/waitlist/signup", json={"email": email, "source": "social"})
+        position = requests.get(f"{BASE_URL}/api/waitlist/position/{email}").json()["position"]
+        requests.delete(f"{BASE_URL}/api/waitlist/unsubscribe/{email}")
+        
+        # Archives every inactive entry, not just this one
+        subprocess.run(
+            [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "archive_inactive.py"),
+             "--retention-days", "0"],
+            check=True, capture_output=True
+        )
+        total_before = requests.get(f"{BASE_URL}/api/waitlist/stats").json()["total_signups"]
+        
+        response = requests.post(
+            f"{BASE_URL}/api/waitlist/bulk",
+            data=f"email,source\n{email},website",
+            headers={"Content-Type": "text/csv", **ADMIN_HEADERS}
+        )
+        report = response.json()
+        restored_position = requests.get(f"{BASE_URL}/api/waitlist/position/{email}").json()["position"]
+        total_after = requests.get(f"{BASE_URL}/api/waitlist/stats").json()["total_signups"]
+        
+        if response.status_code == 200 and report["restored_from_archive"] == 1 \
+                and restored_position == position and total_after == total_before:
+            print(f"✅ Restored from the archive at position {restored_position} (was {position}), "
+                  f"total signups still {total_after}")
+        else:
+            print(f"❌ Archived email not restored: {report}, total {total_before} -> {total_after}")
+            
+    except Exception as e:
+        print(f"❌ Archived bulk import error: {e}")
+
 def test_comprehensive_stats():
     """Test comprehensive statistics"""
     print("\n📊 Testing Comprehensive Statistics...")
@@ -101,6 +206,31 @@ def test_position_lookup():
     except Exception as e:
         print(f"❌ Position lookup error: {e}")
 
+def test_batch_position_lookup():
+    """Test NDJSON batch position lookup"""
+    print("\n📬 Testing Batch Position Lookup...")
+    try:
+        emails = ["John.Doe@Example.com", "jane.smith@company.org", "nobody@example.com", "not-an-email"]
+        response = requests.post(
+            f"{BASE_URL}/api/waitlist/positions",
+            json={"emails": emails},
+            headers=ADMIN_HEADERS
+        )
+    
+        if response.status_code == 200:
+            results = [json.loads(line) for line in response.text.splitlines()]
+            print(f"✅ {len(results)} results (total signups {response.headers.get('X-Total-Signups')}):")
+            for result in results:
+                if result["success"]:
+                    print(f"   #{result['position']}: {result['email']}")
+                else:
+                    print(f"   -  {result['email']}: {result['detail']}")
+        else:
+            print(f"❌ Batch position lookup failed: {response.json()}")
+    
+    except Exception as e:
+        print(f"❌ Batch position lookup error: {e}")
+
 def test_entries_pagination():
     """Test paginated entries endpoint"""
     print("\n📄 Testing Entries Pagination...")
@@ -112,12 +242,47 @@ def test_entries_pagination():
             print(f"✅ Retrieved {len(entries)} entries:")
             for entry in entries:
                 print(f"   #{entry['position']}: {entry['email']} ({entry['source']})")
+            
+            next_cursor = response.headers.get("X-Next-Cursor")
+            if next_cursor:
+                next_page = requests.get(
+                    f"{BASE_URL}/api/waitlist/entries",
+                    params={"limit": 3, "cursor": next_cursor}
+                ).json()
+                print(f"✅ Next page via cursor: {len(next_page)} entries")
+                for entry in next_page:
+                    print(f"   #{entry['position']}: {entry['email']} ({entry['source']})")
         else:
             print("❌ Failed to fetch entries")
             
     except Exception as e:
         print(f"❌ Entries error: {e}")
 
+def test_changes_feed():
+    """Test the resumable change feed"""
+    print("\n🔄 Testing Change Feed...")
+    try:
+        response = requests.get(f"{BASE_URL}/api/waitlist/changes", params={"limit": 3}, headers=ADMIN_HEADERS)
+        
+        if response.status_code == 200:
+            changes = [json.loads(line) for line in response.text.splitlines()]
+            print(f"✅ {len(changes)} changes up to {response.headers.get('X-Changes-Until')}:")
+            for change in changes:
+                print(f"   {change['change']}: {change['email']} ({change['updated_at']})")
+            
+            if changes:
+                resumed = requests.get(
+                    f"{BASE_URL}/api/waitlist/changes",
+                    params={"since": changes[-1]["cursor"], "limit": 3},
+                    headers=ADMIN_HEADERS
+                ).text.splitlines()
+                print(f"✅ Resumed after the last cursor: {len(resumed)} more changes")
+        else:
+            print(f"❌ Change feed failed: {response.json()}")
+            
+    except Exception as e:
+        print(f"❌ Change feed error: {e}")
+
 def test_unsubscribe():
     """Test unsubscribe functionality"""
     print("\n🚫 Testing Unsubscribe...")
@@ -159,6 +324,54 @@ def test_export():
     except Exception as e:
         print(f"❌ Export error: {e}")
 
+def test_conditional_get():
+    """Test ETag / If-None-Match on the stats endpoint"""
+    print("\n🏷️  Testing Conditional GET...")
+    try:
+        response = requests.get(f"{BASE_URL}/api/waitlist/stats")
+        etag = response.headers.get("ETag")
+        if not etag:
+            print("❌ Stats response has no ETag")
+            return
+        
+        response = requests.get(f"{BASE_URL}/api/waitlist/stats", headers={"If-None-Match": etag})
+        if response.status_code == 304:
+            print(f"✅ Unchanged stats answered with 304 ({etag})")
+        else:
+            print(f"❌ Expected 304, got {response.status_code}")
+            
+    except Exception as e:
+        print(f"❌ Conditional GET error: {e}")
+
+def test_metrics():
+    """Test the Prometheus metrics endpoint"""
+    print("\n📈 Testing Metrics...")
+    try:
+        response = requests.get(f"{BASE_URL}/metrics")
+        
+        if response.status_code == 200:
+            lines = response.text.splitlines()
+            routes = [line for line in lines if line.startswith("waitlist_http_request_duration_seconds_count")]
+            statements = [line for line in lines if line.startswith("waitlist_db_statements_total")]
+            print(f"✅ Metrics: {len(routes)} route/status series")
+            if statements:
+                print(f"   SQL statements: {statements[0].split()[-1]}")
+            checked_out = [line for line in lines
+                           if line.startswith("waitlist_db_pool_connections") and 'state="checked_out"' in line]
+            capacity = [line for line in lines if line.startswith("waitlist_db_pool_capacity")]
+            if checked_out and capacity:
+                print(f"   DB pool: {checked_out[0].split()[-1]}/{capacity[0].split()[-1]} connections checked out")
+            worker = {line.split()[0]: float(line.split()[-1]) for line in lines
+                      if line.startswith(("waitlist_worker_startup_seconds", "waitlist_worker_resident_memory_bytes"))}
+            if worker:
+                print(f"   Worker startup: {worker.get('waitlist_worker_startup_seconds', 0):.2f}s, "
+                      f"memory: {worker.get('waitlist_worker_resident_memory_bytes', 0) / (1024 * 1024):.1f} MB")
+        else:
+            print("❌ Metrics endpoint failed")
+            
+    except Exception as e:
+        print(f"❌ Metrics error: {e}")
+
 def main():
     print("🚀 Testing SiikHub Enhanced Waitlist API")
     print("=" * 50)
@@ -171,11 +384,18 @@ def main():
     
     # Run all tests
     test_enhanced_signup()
+    test_concurrent_duplicate_signups()
+    test_bulk_import()
+    test_archived_bulk_import()
     test_comprehensive_stats()
+    test_conditional_get()
     test_position_lookup()
+    test_batch_position_lookup()
     test_entries_pagination()
+    test_changes_feed()
     test_unsubscribe()
     test_export()
+    test_metrics()
     
     print("\n✨ Enhanced API testing completed!")
     print(f"🌐 View API docs at: {BASE_URL}/docs")
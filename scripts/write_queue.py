@@ -0,0 +1,112 @@
+import asyncio
+from typing import Any, Awaitable, Callable, List
+
+
+class WriteQueueUnavailable(Exception):
+    """Raised when the queue is at its backpressure limit or shutting down"""
+
+
+_STOP = object()
+
+
+class GroupCommitQueue:
+    """Single-writer queue that commits submitted items in batches.
+
+    Callers await submit(item) and get back the result the batch function produced
+    for that item once its batch has been flushed. A batch closes when it reaches
+    max_batch items or max_delay_ms after its first item, whichever comes first.
+    flush_batch receives the items in submission order and must return one result
+    per item; an Exception in the result list is raised to that item's caller.
+    """
+
+    def __init__(
+        self,
+        flush_batch: Callable[[List[Any]], Awaitable[List[Any]]],
+        max_batch: int = 200,
+        max_delay_ms: float = 5.0,
+        max_pending: int = 10000
+    ):
+        self.flush_batch = flush_batch
+        self.max_batch = max_batch
+        self.max_delay = max_delay_ms / 1000.0
+        self.queue = asyncio.Queue(maxsize=max_pending)
+        self.writer = None
+        self.closing = False
+        self.batches_flushed = 0
+        self.items_flushed = 0
+
+    @property
+    def pending(self) -> int:
+        return self.queue.qsize()
+
+    def start(self):
+        """Start the writer task on the running event loop"""
+        self.writer = asyncio.create_task(self._run())
+
+    async def submit(self, item: Any) -> Any:
+        """Queue an item and wait for its result; rejects immediately when full"""
+        if self.closing:
+            raise WriteQueueUnavailable("Write queue is shutting down")
+
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self.queue.put_nowait((item, future))
+        except asyncio.QueueFull:
+            raise WriteQueueUnavailable("Write queue is full")
+
+        # A caller that goes away cancels the future, not the item: it is still written
+        return await future
+
+    async def drain(self):
+        """Stop accepting items and flush everything already accepted"""
+        if self.writer is None or self.closing:
+            return
+        self.closing = True
+        await self.queue.put(_STOP)
+        await self.writer
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+
+        while not stopping:
+            first = await self.queue.get()
+            if first is _STOP:
+                break
+
+            batch = [first]
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.max_batch:
+                try:
+                    item = self.queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self.queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            await self._commit(batch)
+
+    async def _commit(self, batch):
+        try:
+            results = await self.flush_batch([item for item, _ in batch])
+        except Exception as e:
+            results = [e] * len(batch)
+
+        self.batches_flushed += 1
+        self.items_flushed += len(batch)
+
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)